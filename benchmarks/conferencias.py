@@ -0,0 +1,147 @@
+import argparse
+import os
+import sys
+import tempfile
+import traceback
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def conferir_top_com_poucas_vendas(arquivo, diretorio):
+    # Com menos de N categorias vendendo em um dos períodos, o top N desse período não é
+    # completado com categorias sem vendas nele: o resultado é a união dos top N reais
+    # (calculada direto das linhas), nos dois motores
+    from painel_vendas.carregamento import carregar_dataset
+    from painel_vendas.comparacao import periodo
+    from painel_vendas.consultas import criar_consulta
+    from painel_vendas.filtros import criar_filtros
+    from painel_vendas.indice_tempo import obter_indice_tempo
+
+    dataset = carregar_dataset(arquivo, os.path.join(diretorio, 'cache'))
+    indice_tempo = obter_indice_tempo(dataset)
+    filtros = criar_filtros(indice_tempo.data_min(), indice_tempo.data_max())
+    periodo_a, periodo_b = periodo('mes', 2016, 9), periodo('ano', 2017)
+    top_n = 10
+
+    df = dataset.df
+    ano_mes = df['order_purchase_year_month'].astype(str)
+    esperado = set()
+    for meses in (['2016-09'], [f'2017-{mes:02d}' for mes in range(1, 13)]):
+        vendas = df[ano_mes.isin(meses)].groupby('product_category_name', observed=True)['total_price'].sum()
+        vendas = vendas[vendas > 0]
+        if meses == ['2016-09']:
+            assert 0 < len(vendas) < top_n, f"o primeiro período deveria ter poucas categorias: {len(vendas)}"
+        esperado |= set(vendas.nlargest(top_n).index.astype(str))
+
+    for motor in ('pandas', 'duckdb'):
+        comparacao = criar_consulta(dataset, filtros, motor=motor).comparacao(periodo_a, periodo_b, top_n=top_n)
+        categorias = set(comparacao['product_category_name'])
+        assert categorias == esperado, (
+            f"{motor}: sobrando {sorted(categorias - esperado)}, faltando {sorted(esperado - categorias)}"
+        )
+
+
+def conferir_hash_conferido_uma_vez(arquivo, diretorio):
+    # Origem remota com cópia válida em cache: o hash do objeto é conferido na primeira carga do
+    # processo e não de novo nas seguintes, inclusive depois de anexar um lote (quando o dataset
+    # em memória passa a ter a chave da versão com o lote) e no modo em blocos
+    import json
+    import time
+
+    import pandas as pd
+
+    from painel_vendas import carregamento
+
+    url = 'https://exemplo.invalido/order_items.csv'
+    cache = os.path.join(diretorio, 'cache')
+    os.makedirs(os.path.join(cache, 'objetos'), exist_ok=True)
+    df = pd.read_feather(arquivo)
+    corte = int(len(df) * 0.9)
+    base = os.path.join(diretorio, 'base.csv')
+    df.iloc[:corte].to_csv(base, index=False)
+    sha = carregamento.calcular_hash(base)
+    os.replace(base, carregamento._caminho_objeto(cache, sha))
+    entrada = {'sha256': sha, 'tamanho': os.path.getsize(carregamento._caminho_objeto(cache, sha)),
+               'verificado_em': time.time()}
+    with open(os.path.join(cache, 'manifesto.json'), 'w', encoding='utf-8') as manifesto:
+        json.dump({url: entrada}, manifesto)
+    lote = os.path.join(diretorio, 'lote.feather')
+    df.iloc[corte:].reset_index(drop=True).to_feather(lote)
+
+    chamadas = []
+    calcular_hash = carregamento.calcular_hash
+
+    def contar(caminho):
+        chamadas.append(os.path.basename(caminho))
+        return calcular_hash(caminho)
+
+    carregamento.calcular_hash = contar
+    try:
+        carregamento.carregar_dataset(url, cache)
+        assert len(chamadas) == 1, f"primeira carga: {chamadas}"
+        carregamento.anexar_delta(lote, origem=url, diretorio_cache=cache)
+        # só o hash do próprio lote
+        assert chamadas[1:] == ['lote.feather'], f"anexar_delta: {chamadas[1:]}"
+        del chamadas[:]
+        for em_blocos in (False, True, False, True):
+            carregamento.carregar_dataset(url, cache, em_blocos=em_blocos)
+        assert not chamadas, f"cargas repetidas recalcularam o hash: {chamadas}"
+    finally:
+        carregamento.calcular_hash = calcular_hash
+
+
+def conferir_relatorio_sem_filtro_de_status(arquivo, diretorio):
+    # No relatório, status=None (--status todos) não filtra por status: as combinações incluem
+    # pedidos de todos os status, e uma lista de status continua filtrando por ela
+    from painel_vendas.carregamento import carregar_dataset
+    from painel_vendas.consultas import criar_consulta
+    from painel_vendas.filtros import STATUS_PADRAO
+    from painel_vendas.relatorio import combinacoes
+
+    dataset = carregar_dataset(arquivo, os.path.join(diretorio, 'cache'))
+    df = dataset.df
+    assert not df['order_status'].isin(STATUS_PADRAO).all(), "os dados deveriam ter outros status"
+
+    for status, linhas in ((None, df), (STATUS_PADRAO, df[df['order_status'].isin(STATUS_PADRAO)])):
+        [combinacao] = combinacoes(dataset, status=status)
+        filtros = combinacao['filtros']
+        assert (filtros.status is None) if status is None else set(filtros.status) == set(status), f"{status}: {filtros.status}"
+        total = criar_consulta(dataset, filtros).metricas.total_vendas
+        assert abs(total - linhas['total_price'].sum()) < 1e-6 * max(1.0, total), f"{status}: total {total}"
+
+
+CONFERENCIAS = [
+    conferir_top_com_poucas_vendas,
+    conferir_hash_conferido_uma_vez,
+    conferir_relatorio_sem_filtro_de_status,
+]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Conferências de comportamento do painel em dados sintéticos (sai com erro se alguma falhar).'
+    )
+    parser.add_argument('--linhas', type=int, default=50_000, help='itens de pedido sintéticos')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, RAIZ)
+    from benchmarks.conferir_motores import gerar_dados
+    from painel_vendas.formato_colunar import gravar_colunar
+
+    falhas = 0
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'order_items.feather')
+        gravar_colunar(gerar_dados(args.linhas, args.semente), arquivo)
+        for conferencia in CONFERENCIAS:
+            # Cada conferência com um diretório de cache próprio
+            with tempfile.TemporaryDirectory() as diretorio_conferencia:
+                try:
+                    conferencia(arquivo, diretorio_conferencia)
+                except Exception:
+                    falhas += 1
+                    print(f"FALHOU {conferencia.__name__}")
+                    traceback.print_exc()
+                else:
+                    print(f"ok     {conferencia.__name__}")
+    sys.exit(1 if falhas else 0)
@@ -0,0 +1,131 @@
+import argparse
+import datetime
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fração de itens sem categoria (na base da Olist, cerca de 1,4% dos produtos não têm categoria)
+SEM_CATEGORIA = 0.02
+
+# Pares de períodos comparados: o do dashboard (ano contra ano), períodos sobrepostos e
+# períodos com meses sem vendas
+PERIODOS = [
+    ('anterior', ('semestre', 2018, 1)),
+    (('ano', 2017), ('semestre', 2017, 1)),
+    (('trimestre', 2017, 4), ('mes', 2017, 11)),
+    (('ano', 2016), ('ano', 2019)),
+]
+
+
+def gerar_dados(n_linhas, semente):
+    from benchmarks.gerador import gerar
+
+    df = gerar(n_linhas, semente)
+    sem_categoria = np.random.default_rng(semente + 1).random(len(df)) < SEM_CATEGORIA
+    df.loc[sem_categoria, 'product_category_name'] = np.nan
+    return df
+
+
+def estados_de_filtro(dataset):
+    # Filtros como a barra lateral e a API montam: padrão, recortes de data, estados e
+    # categorias (inclusive valores ausentes da base e a seleção vazia) e status
+    from painel_vendas.filtros import STATUS_PADRAO, criar_filtros
+    from painel_vendas.indice_tempo import obter_indice_tempo
+
+    indice_tempo = obter_indice_tempo(dataset)
+    inicio, fim = indice_tempo.data_min(), indice_tempo.data_max()
+    dia = datetime.timedelta(days=1)
+    return {
+        'padrao': criar_filtros(inicio, fim, status=STATUS_PADRAO),
+        'todos_status': criar_filtros(inicio, fim),
+        'recorte_de_datas': criar_filtros(inicio + 40 * dia, fim - 70 * dia, status=STATUS_PADRAO),
+        'estados': criar_filtros(inicio, fim, estados=['SP', 'RJ'], status=STATUS_PADRAO),
+        'categorias': criar_filtros(
+            datetime.date(2017, 3, 10), datetime.date(2017, 9, 20),
+            categorias=['beleza_saude', 'esporte_lazer'], status=['delivered'],
+        ),
+        'categoria_inexistente': criar_filtros(inicio, fim, categorias=['nao_existe']),
+        'estado_inexistente': criar_filtros(inicio, fim, estados=['XX'], status=STATUS_PADRAO),
+        'categoria_e_inexistente': criar_filtros(inicio, fim, categorias=['cama_mesa_banho', 'nao_existe']),
+        'sem_categorias': criar_filtros(inicio, fim, categorias=[]),
+    }
+
+
+def _periodos():
+    from painel_vendas.comparacao import periodo, periodo_anterior
+
+    pares = []
+    for a, b in PERIODOS:
+        b = periodo(*b)
+        pares.append((periodo_anterior(b) if a == 'anterior' else periodo(*a), b))
+    return pares
+
+
+def _diferenca(esperado, obtido):
+    # None quando iguais (valores numéricos com tolerância de ponto flutuante)
+    if isinstance(esperado, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(
+                esperado.reset_index(drop=True), obtido.reset_index(drop=True), check_dtype=False, check_exact=False
+            )
+        except AssertionError as erro:
+            return str(erro).strip().splitlines()[0]
+        return None
+    if not np.isclose(esperado, obtido):
+        return f"{esperado} != {obtido}"
+    return None
+
+
+def conferir(dataset):
+    # Cada pergunta das abas nos dois motores; retorna as diferenças encontradas
+    from painel_vendas.consultas import criar_consulta
+
+    diferencas = []
+    for nome, filtros in estados_de_filtro(dataset).items():
+        pandas = criar_consulta(dataset, filtros, motor='pandas')
+        sql = criar_consulta(dataset, filtros, motor='duckdb')
+        resultados = [
+            (campo, getattr(pandas.metricas, campo), getattr(sql.metricas, campo)) for campo in pandas.metricas._fields
+        ]
+        for periodo_a, periodo_b in _periodos():
+            for dimensao in ('product_category_name', 'customer_state', 'seller_state'):
+                resultados.append((
+                    f'comparacao {periodo_a.rotulo} x {periodo_b.rotulo} por {dimensao}',
+                    pandas.comparacao(periodo_a, periodo_b, dimensao=dimensao, top_n=5),
+                    sql.comparacao(periodo_a, periodo_b, dimensao=dimensao, top_n=5),
+                ))
+        resultados.append(('pedidos_por_fotos', pandas.pedidos_por_fotos(), sql.pedidos_por_fotos()))
+
+        for pergunta, esperado, obtido in resultados:
+            diferenca = _diferenca(esperado, obtido)
+            if diferenca:
+                diferencas.append((nome, pergunta, diferenca))
+    return diferencas
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Confere se os motores pandas e duckdb respondem o mesmo para vários estados de filtro.'
+    )
+    parser.add_argument('--linhas', type=int, default=50_000, help='itens de pedido sintéticos')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    sys.path.insert(0, RAIZ)
+    from painel_vendas.carregamento import carregar_dataset
+    from painel_vendas.formato_colunar import gravar_colunar
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'order_items.feather')
+        gravar_colunar(gerar_dados(args.linhas, args.semente), arquivo)
+        diferencas = conferir(carregar_dataset(arquivo, os.path.join(diretorio, 'cache')))
+
+    for nome, pergunta, diferenca in diferencas:
+        print(f"{nome:<24} {pergunta}: {diferenca}")
+    print(f"{len(diferencas)} diferença(s) entre os motores")
+    sys.exit(1 if diferencas else 0)
@@ -0,0 +1,230 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cenários medidos em cada tamanho: o filtro padrão (primeira visita, com as estruturas sendo
+# construídas) e um filtro por estado e categorias (estruturas prontas, caches de resultado limpos)
+CENARIOS = {
+    'padrao': {},
+    'estado': {
+        'estados_selecionados': ['SP'],
+        'categorias_selecionadas': ['beleza_saude', 'cama_mesa_banho', 'esporte_lazer'],
+    },
+}
+
+
+def _rss_max_mb():
+    # Pico de memória residente do processo (Linux informa em KB, macOS em bytes)
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (2 ** 20 if sys.platform == 'darwin' else 2 ** 10), 1)
+
+
+def _medir(resultados, estagio, funcao, *args):
+    # Com o tracemalloc ligado (passada de memória) registra o pico e o retido da etapa; o tempo
+    # dessa passada não é usado, porque o rastreamento deixa o código Python várias vezes mais lento
+    rastreando = tracemalloc.is_tracing()
+    if rastreando:
+        tracemalloc.reset_peak()
+        antes = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    valor = funcao(*args)
+    segundos = time.perf_counter() - inicio
+    medicao = resultados[estagio] = {'segundos': round(segundos, 4), 'rss_max_mb': _rss_max_mb()}
+    if rastreando:
+        atual, pico = tracemalloc.get_traced_memory()
+        medicao['pico_mb'] = round((pico - antes) / 2 ** 20, 1)
+        medicao['retido_mb'] = round((atual - antes) / 2 ** 20, 1)
+    return valor
+
+
+def medir_tamanho(n_linhas, semente, graficos, processos=1, motor='pandas', rastrear=False):
+    # Roda em um processo novo por tamanho e passada, para o pico de memória de um não
+    # contaminar o outro. Com 'rastrear', as etapas rodam com o tracemalloc ligado.
+    os.environ['PAINEL_GRAFICOS'] = graficos
+    os.environ['PAINEL_PROCESSOS'] = str(processos)
+    os.environ['PAINEL_MOTOR'] = motor
+    sys.path.insert(0, RAIZ)
+
+    # O streamlit é substituído antes de importar o app
+    from painel_vendas.streamlit_falso import StreamlitFalso
+
+    st = StreamlitFalso()
+    sys.modules['streamlit'] = st
+
+    from painel_vendas import app as painel
+    from benchmarks.gerador import gerar
+    from painel_vendas.cache_resultados import cache
+    from painel_vendas.carregamento import carregar_dataset
+    from painel_vendas.consultas import criar_consulta
+    from painel_vendas.formato_colunar import gravar_colunar
+    from painel_vendas.particionado import encerrar
+
+    painel.definicao_parametros_graficos()
+    # Os gráficos Vega não têm cache de figuras nem carregam matplotlib/seaborn
+    cache_graficos = None
+    if graficos == 'matplotlib':
+        # Importado antes das etapas medidas: o custo de importar matplotlib/seaborn é de
+        # partida do processo (medido em benchmarks/inicializacao.py), não de uma visão
+        from painel_vendas.graficos import cache_graficos
+    if rastrear:
+        tracemalloc.start()
+    preparacao = {}
+    cenarios = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'order_items.feather')
+        df = _medir(preparacao, 'gerar', gerar, n_linhas, semente)
+        _medir(preparacao, 'gravar', gravar_colunar, df, arquivo)
+        del df
+        dataset = _medir(preparacao, 'carregar', carregar_dataset, arquivo, os.path.join(diretorio, 'cache'))
+
+        for nome, estado in CENARIOS.items():
+            st.session_state.clear()
+            st.session_state.update(estado)
+            cache.limpar()
+            if cache_graficos is not None:
+                cache_graficos.limpar()
+
+            estagios = cenarios[nome] = {}
+            filtros = _medir(estagios, 'aplicar_filtros', painel.aplicar_filtros, dataset)
+            consulta = criar_consulta(dataset, filtros)
+            metricas = _medir(estagios, 'metricas', lambda: consulta.metricas)
+            _medir(estagios, 'big_numbers', painel.big_numbers, metricas)
+            _medir(estagios, 'visoes_gerais', painel.visoes_gerais, metricas)
+            _medir(estagios, 'visoes_temporais', painel.visoes_temporais, metricas)
+            _medir(estagios, 'visoes_categoria', painel.visoes_categoria, metricas, consulta)
+            _medir(estagios, 'insights', painel.insights, consulta)
+    if rastrear:
+        tracemalloc.stop()
+    encerrar()
+
+    return {'linhas': n_linhas, 'preparacao': preparacao, 'cenarios': cenarios, 'rss_max_mb': _rss_max_mb()}
+
+
+def _juntar(tempo, memoria):
+    # Tempo e RSS da passada sem rastreamento; pico e retido (tracemalloc) da passada de memória
+    rastreadas = dict(_linhas_do_relatorio({'tamanhos': {'': memoria}}))
+    for chave, valores in _linhas_do_relatorio({'tamanhos': {'': tempo}}):
+        valores.update(pico_mb=rastreadas[chave]['pico_mb'], retido_mb=rastreadas[chave]['retido_mb'])
+    return tempo
+
+
+def _passada(contexto, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as processo:
+        return processo.submit(medir_tamanho, *args).result()
+
+
+def executar(tamanhos, semente=0, graficos='matplotlib', processos=1, motor='pandas', rastrear=True):
+    from benchmarks.gerador import interpretar_tamanho
+
+    import numpy as np
+    import pandas as pd
+
+    relatorio = {
+        'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'sistema': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'semente': semente,
+        'graficos': graficos,
+        'processos': processos,
+        'motor': motor,
+        'tracemalloc': rastrear,
+        'tamanhos': {},
+    }
+    contexto = multiprocessing.get_context('spawn')
+    for rotulo in tamanhos:
+        n_linhas = interpretar_tamanho(rotulo)
+        print(f"{rotulo}: {n_linhas:,} linhas...", flush=True)
+        argumentos = (n_linhas, semente, graficos, processos, motor)
+        try:
+            # Duas passadas, cada uma em um processo novo: tempos sem rastreamento e, à parte,
+            # a memória com o tracemalloc (sem ele, só o RSS)
+            medicao = _passada(contexto, *argumentos)
+            if rastrear:
+                medicao = _juntar(medicao, _passada(contexto, *argumentos, True))
+            relatorio['tamanhos'][rotulo] = medicao
+        except (BrokenProcessPool, MemoryError) as erro:
+            # Normalmente falta de memória: o processo do tamanho é encerrado pelo sistema
+            relatorio['tamanhos'][rotulo] = {'linhas': n_linhas, 'erro': repr(erro)}
+    return relatorio
+
+
+def _linhas_do_relatorio(relatorio):
+    for rotulo, medicao in relatorio['tamanhos'].items():
+        if 'erro' in medicao:
+            continue
+        for estagio, valores in medicao['preparacao'].items():
+            yield (rotulo, '-', estagio), valores
+        for cenario, estagios in medicao['cenarios'].items():
+            for estagio, valores in estagios.items():
+                yield (rotulo, cenario, estagio), valores
+
+
+def imprimir(relatorio, anterior=None):
+    # Tabela de tempo e pico por estágio (o RSS máximo, sem a passada de memória); com 'anterior',
+    # a razão entre os tempos (atual / anterior)
+    base = dict(_linhas_do_relatorio(anterior)) if anterior else {}
+    for rotulo, medicao in relatorio['tamanhos'].items():
+        if 'erro' in medicao:
+            print(f"{rotulo:>6} | erro: {medicao['erro']}")
+    for (rotulo, cenario, estagio), valores in _linhas_do_relatorio(relatorio):
+        pico = f"{valores['pico_mb']:9.1f} MB" if 'pico_mb' in valores else f"{valores['rss_max_mb']:9.1f} MB RSS"
+        linha = f"{rotulo:>6} | {cenario:<7} | {estagio:<18} {valores['segundos']:9.3f}s {pico}"
+        if (rotulo, cenario, estagio) in base and base[(rotulo, cenario, estagio)]['segundos']:
+            linha += f"  x{valores['segundos'] / base[(rotulo, cenario, estagio)]['segundos']:.2f}"
+        print(linha)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Mede tempo e pico de memória de cada etapa do dashboard em dados sintéticos.'
+    )
+    parser.add_argument('--tamanhos', default='100k,1m', help='lista separada por vírgulas (100k, 1m, 10m, 50m ou número)')
+    parser.add_argument('--semente', type=int, default=0)
+    parser.add_argument('--graficos', choices=['matplotlib', 'vega'], default='matplotlib')
+    parser.add_argument(
+        '--processos', type=int, default=1,
+        help='processos para construir o cubo e os distintos (PAINEL_PROCESSOS; 0 = um por núcleo)'
+    )
+    parser.add_argument('--motor', choices=['pandas', 'duckdb'], default='pandas', help='motor das consultas (PAINEL_MOTOR)')
+    parser.add_argument(
+        '--sem-tracemalloc', action='store_true',
+        help='só a passada de tempo; a memória fica apenas no RSS máximo do processo'
+    )
+    parser.add_argument('--saida', default='benchmark.json', help='arquivo JSON do relatório')
+    parser.add_argument('--comparar', help='relatório anterior para comparar os tempos')
+    args = parser.parse_args()
+
+    relatorio = executar(
+        args.tamanhos.split(','), args.semente, args.graficos, args.processos, args.motor, not args.sem_tracemalloc
+    )
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2)
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            anterior = json.load(arquivo)
+    imprimir(relatorio, anterior)
+    print(f"Relatório: {args.saida}")
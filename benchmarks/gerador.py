@@ -0,0 +1,188 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from painel_vendas.formato_colunar import aplicar_esquema, gravar_colunar
+
+# Pedidos por mês na base pública da Olist (set/2016 a out/2018): dá a curva de crescimento
+PEDIDOS_POR_MES = {
+    '2016-09': 4, '2016-10': 324, '2016-12': 1,
+    '2017-01': 800, '2017-02': 1780, '2017-03': 2682, '2017-04': 2404, '2017-05': 3700, '2017-06': 3245,
+    '2017-07': 4026, '2017-08': 4331, '2017-09': 4285, '2017-10': 4631, '2017-11': 7544, '2017-12': 5673,
+    '2018-01': 7269, '2018-02': 6728, '2018-03': 7211, '2018-04': 6939, '2018-05': 6873, '2018-06': 6167,
+    '2018-07': 6292, '2018-08': 6512, '2018-09': 16, '2018-10': 4,
+}
+
+# Participação (%) de cada estado entre clientes e entre vendedores
+ESTADOS_CLIENTES = {
+    'SP': 42.0, 'RJ': 12.9, 'MG': 11.7, 'RS': 5.5, 'PR': 5.1, 'SC': 3.7, 'BA': 3.4, 'DF': 2.2, 'ES': 2.0,
+    'GO': 2.0, 'PE': 1.7, 'CE': 1.3, 'PA': 1.0, 'MT': 0.9, 'MA': 0.8, 'MS': 0.7, 'PB': 0.5, 'PI': 0.5,
+    'RN': 0.5, 'AL': 0.4, 'SE': 0.3, 'TO': 0.3, 'RO': 0.25, 'AM': 0.15, 'AC': 0.08, 'AP': 0.07, 'RR': 0.05,
+}
+ESTADOS_VENDEDORES = {
+    'SP': 71.0, 'MG': 7.9, 'PR': 7.7, 'RJ': 4.3, 'SC': 3.6, 'RS': 2.0, 'DF': 0.8, 'BA': 0.6, 'GO': 0.5,
+    'PE': 0.4, 'ES': 0.3, 'MA': 0.3, 'CE': 0.2, 'MT': 0.15, 'MS': 0.1, 'RN': 0.1, 'PB': 0.05, 'PI': 0.03,
+    'RO': 0.03, 'SE': 0.02, 'AM': 0.02, 'PA': 0.02, 'AC': 0.01,
+}
+
+# Status dos pedidos (fração)
+STATUS = {
+    'delivered': 0.970, 'shipped': 0.0111, 'canceled': 0.0063, 'unavailable': 0.0061,
+    'invoiced': 0.0032, 'processing': 0.0030, 'created': 0.00005, 'approved': 0.00002,
+}
+
+# Categorias em ordem aproximada de popularidade (a frequência cai como uma lei de Zipf)
+CATEGORIAS = [
+    'cama_mesa_banho', 'beleza_saude', 'esporte_lazer', 'moveis_decoracao', 'informatica_acessorios',
+    'utilidades_domesticas', 'relogios_presentes', 'telefonia', 'ferramentas_jardim', 'automotivo',
+    'brinquedos', 'cool_stuff', 'perfumaria', 'bebes', 'eletronicos', 'papelaria',
+    'fashion_bolsas_e_acessorios', 'pet_shop', 'moveis_escritorio', 'consoles_games', 'malas_acessorios',
+    'construcao_ferramentas_construcao', 'eletrodomesticos', 'instrumentos_musicais', 'eletroportateis',
+    'casa_construcao', 'livros_interesse_geral', 'alimentos', 'moveis_sala', 'casa_conforto', 'bebidas',
+    'audio', 'market_place', 'construcao_ferramentas_iluminacao', 'climatizacao',
+    'moveis_cozinha_area_de_servico_jantar_e_jardim', 'alimentos_bebidas', 'industria_comercio_e_negocios',
+    'livros_tecnicos', 'telefonia_fixa', 'fashion_calcados', 'eletrodomesticos_2',
+    'construcao_ferramentas_jardim', 'agro_industria_e_comercio', 'artes', 'pcs',
+    'sinalizacao_e_seguranca', 'construcao_ferramentas_seguranca', 'artigos_de_natal',
+    'fashion_roupa_masculina', 'fashion_underwear_e_moda_praia', 'moveis_quarto',
+    'construcao_ferramentas_ferramentas', 'tablets_impressao_imagem', 'portateis_casa_forno_e_cafe',
+    'cine_foto', 'dvds_blu_ray', 'fraldas_higiene', 'flores', 'artigos_de_festas', 'musica',
+    'moveis_colchao_e_estofado', 'fashion_esporte', 'la_cuisine', 'artes_e_artesanato',
+    'fashion_roupa_feminina', 'casa_conforto_2', 'portateis_cozinha_e_preparadores_de_alimentos',
+    'seguros_e_servicos', 'cds_dvds_musicais', 'fashion_roupa_infanto_juvenil', 'pc_gamer',
+    'livros_importados',
+]
+
+# Proporções da base original: ~1,14 itens por pedido, ~0,97 cliente por pedido e
+# ~3 mil vendedores para ~113 mil itens (o número de vendedores cresce mais devagar que os itens)
+ITENS_POR_PEDIDO = 1.14
+CLIENTES_POR_PEDIDO = 0.97
+LINHAS_REFERENCIA = 112_650
+VENDEDORES_REFERENCIA = 3_095
+
+TAMANHOS = {'100k': 100_000, '1m': 1_000_000, '10m': 10_000_000, '50m': 50_000_000}
+
+_HEXA = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+
+def _probabilidades(pesos):
+    pesos = np.asarray(pesos, dtype=np.float64)
+    return pesos / pesos.sum()
+
+
+def _zipf(n, expoente):
+    return _probabilidades(1.0 / np.arange(1, n + 1) ** expoente)
+
+
+def _ids(n, sal):
+    # n ids de 32 caracteres hexadecimais (como os md5 da Olist), derivados do índice e do 'sal'
+    base = np.arange(n, dtype=np.uint64) * np.uint64(2) + np.uint64(sal * 2 + 1)
+    alto = pd.util.hash_array(base)
+    baixo = pd.util.hash_array(alto ^ np.uint64(0x9E3779B97F4A7C15))
+    octetos = np.stack([alto, baixo], axis=1).view(np.uint8)
+    texto = np.empty((n, 32), dtype=np.uint8)
+    texto[:, 0::2] = _HEXA[octetos >> 4]
+    texto[:, 1::2] = _HEXA[octetos & 15]
+    binario = pa.FixedSizeBinaryArray.from_buffers(pa.binary(32), n, [None, pa.py_buffer(texto)])
+    return binario.cast(pa.binary()).cast(pa.string())
+
+
+def _coluna_ids(ids, codigos):
+    # Coluna de texto (mesmo tipo que o read_csv produz) com o id de cada linha
+    return pd.Series(ids.take(pa.array(codigos)).to_pandas())
+
+
+def _categorica(valores, codigos):
+    # Categórica com as categorias ordenadas, como aplicar_esquema deixa
+    valores = np.asarray(valores)
+    ordem = np.argsort(valores)
+    posicao = np.empty(len(valores), dtype=np.int64)
+    posicao[ordem] = np.arange(len(valores))
+    return pd.Categorical.from_codes(posicao[codigos], categories=valores[ordem])
+
+
+def gerar(n_linhas, semente=0):
+    # Itens de pedido sintéticos com as colunas de order_items_cleaned.csv (já no ESQUEMA),
+    # na ordem em que um CSV exportado viria (não ordenados por data). Mesmo 'n_linhas' e
+    # 'semente' produzem sempre o mesmo DataFrame.
+    rng = np.random.default_rng(semente)
+
+    # Pedidos: itens por pedido geométrico com média ITENS_POR_PEDIDO, cortado em n_linhas
+    n_pedidos_max = int(n_linhas / ITENS_POR_PEDIDO * 1.1) + 10
+    itens = rng.geometric(1 / ITENS_POR_PEDIDO, n_pedidos_max)
+    n_pedidos = int(np.searchsorted(np.cumsum(itens), n_linhas)) + 1
+    pedido_da_linha = np.repeat(np.arange(n_pedidos), itens[:n_pedidos])[:n_linhas]
+
+    # Atributos do pedido: data (crescimento mês a mês da Olist), cliente e status
+    meses = pd.PeriodIndex(list(PEDIDOS_POR_MES), freq='M')
+    mes = rng.choice(len(meses), n_pedidos, p=_probabilidades(list(PEDIDOS_POR_MES.values())))
+    inicio = meses.start_time.to_numpy(dtype='datetime64[s]').view(np.int64)
+    fim = (meses + 1).start_time.to_numpy(dtype='datetime64[s]').view(np.int64)
+    segundos = inicio[mes] + (rng.random(n_pedidos) * (fim - inicio)[mes]).astype(np.int64)
+
+    n_clientes = max(1, int(n_pedidos * CLIENTES_POR_PEDIDO))
+    # Cada cliente compra pelo menos uma vez; os pedidos restantes são recompras
+    cliente = rng.permutation(np.concatenate([
+        np.arange(n_clientes), rng.integers(0, n_clientes, n_pedidos - n_clientes)
+    ]))
+    estado_do_cliente = rng.choice(
+        len(ESTADOS_CLIENTES), n_clientes, p=_probabilidades(list(ESTADOS_CLIENTES.values()))
+    )
+    status = rng.choice(len(STATUS), n_pedidos, p=_probabilidades(list(STATUS.values())))
+
+    # Atributos do item: vendedor (poucos vendem muito), categoria, preço e fotos
+    n_vendedores = max(100, int(VENDEDORES_REFERENCIA * (n_linhas / LINHAS_REFERENCIA) ** 0.5))
+    vendedor = rng.choice(n_vendedores, n_linhas, p=_zipf(n_vendedores, 0.9))
+    estado_do_vendedor = rng.choice(
+        len(ESTADOS_VENDEDORES), n_vendedores, p=_probabilidades(list(ESTADOS_VENDEDORES.values()))
+    )
+    categoria = rng.choice(len(CATEGORIAS), n_linhas, p=_zipf(len(CATEGORIAS), 1.0))
+    escala_categoria = rng.lognormal(0.0, 0.4, len(CATEGORIAS))
+    preco = np.round(rng.lognormal(4.45, 0.8, n_linhas) * escala_categoria[categoria], 2)
+    fotos = rng.choice(np.arange(1, 21), n_linhas, p=_zipf(20, 1.6))
+
+    datas = pd.DatetimeIndex(segundos[pedido_da_linha].astype('datetime64[s]')).as_unit('ns')
+    ano_mes = mes[pedido_da_linha]
+    df = pd.DataFrame({
+        'order_id': _coluna_ids(_ids(n_pedidos, 1), pedido_da_linha),
+        'customer_unique_id': _coluna_ids(_ids(n_clientes, 2), cliente[pedido_da_linha]),
+        'seller_id': _coluna_ids(_ids(n_vendedores, 3), vendedor),
+        'order_status': _categorica(list(STATUS), status[pedido_da_linha]),
+        'order_purchase_timestamp': datas,
+        'customer_state': _categorica(list(ESTADOS_CLIENTES), estado_do_cliente[cliente[pedido_da_linha]]),
+        'seller_state': _categorica(list(ESTADOS_VENDEDORES), estado_do_vendedor[vendedor]),
+        'product_category_name': _categorica(CATEGORIAS, categoria),
+        'product_photos_qty': fotos.astype(np.int64),
+        'total_price': preco,
+        'order_purchase_year': datas.year,
+        'order_purchase_month': datas.month,
+        'order_purchase_year_month': _categorica(meses.strftime('%Y-%m'), ano_mes),
+    })
+    # Categorias sem linhas (amostras pequenas) não aparecem, como na leitura do CSV
+    df = df.assign(**{
+        coluna: df[coluna].cat.remove_unused_categories()
+        for coluna in df.columns if isinstance(df[coluna].dtype, pd.CategoricalDtype)
+    })
+    return aplicar_esquema(df)
+
+
+def interpretar_tamanho(texto):
+    # '100k', '1m', '10m', '50m' ou um número de linhas
+    return TAMANHOS.get(texto.lower()) or int(texto.replace('_', ''))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Gera itens de pedido sintéticos no formato da base Olist.')
+    parser.add_argument('tamanho', help="número de linhas ou um de 100k, 1m, 10m, 50m")
+    parser.add_argument('destino', help='arquivo de saída (.feather, .parquet ou .csv)')
+    parser.add_argument('--semente', type=int, default=0)
+    args = parser.parse_args()
+
+    dados = gerar(interpretar_tamanho(args.tamanho), args.semente)
+    if args.destino.lower().endswith('.csv'):
+        dados.to_csv(args.destino, index=False)
+    else:
+        gravar_colunar(dados, args.destino)
+    print(f"{len(dados):,} linhas -> {args.destino}")
@@ -0,0 +1,115 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pontos de entrada medidos. Os usos sem navegador (api, relatorio, benchmark) não deveriam
+# carregar as bibliotecas de gráficos; 'graficos' mostra quanto elas custam sozinhas.
+ALVOS = {
+    'api': 'painel_vendas.api',
+    'relatorio': 'painel_vendas.relatorio',
+    'benchmark': 'benchmarks.executar',
+    'carregamento': 'painel_vendas.carregamento',
+    'app': 'painel_vendas.app',
+    'graficos': 'painel_vendas.graficos',
+}
+
+# Bibliotecas pesadas conferidas depois da importação
+PESADAS = ['matplotlib', 'seaborn', 'gdown', 'PIL', 'duckdb', 'pyarrow', 'streamlit']
+
+CODIGO = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+segundos = time.perf_counter() - inicio
+print(json.dumps({{
+    'segundos': segundos,
+    'modulos': len(sys.modules),
+    'pesadas': [nome for nome in {pesadas!r} if nome in sys.modules],
+}}))
+"""
+
+
+def medir(modulo, repeticoes):
+    # Cada repetição em um interpretador novo, como uma partida a frio do processo. A primeira
+    # execução aquece o cache de disco do sistema (e os .pyc) e não entra na conta.
+    codigo = CODIGO.format(modulo=modulo, pesadas=PESADAS)
+    medicoes = []
+    for i in range(repeticoes + 1):
+        inicio = time.perf_counter()
+        resultado = subprocess.run(
+            [sys.executable, '-c', codigo], cwd=RAIZ, capture_output=True, text=True, check=True
+        )
+        processo = time.perf_counter() - inicio
+        if i:
+            medicoes.append({**json.loads(resultado.stdout.splitlines()[-1]), 'processo': processo})
+    return {
+        'importacao_s': round(statistics.median(m['segundos'] for m in medicoes), 4),
+        'processo_s': round(statistics.median(m['processo'] for m in medicoes), 4),
+        'modulos': medicoes[-1]['modulos'],
+        'pesadas': medicoes[-1]['pesadas'],
+    }
+
+
+def executar(alvos, repeticoes=5):
+    import numpy as np
+    import pandas as pd
+
+    return {
+        'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'ambiente': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'sistema': platform.platform(),
+        },
+        'repeticoes': repeticoes,
+        'alvos': {nome: medir(ALVOS[nome], repeticoes) for nome in alvos},
+    }
+
+
+def imprimir(relatorio, anterior=None):
+    # Mediana do tempo de importação e do processo inteiro (interpretador + importação);
+    # com 'anterior', a razão entre os tempos de importação (atual / anterior)
+    base = anterior['alvos'] if anterior else {}
+    for nome, medicao in relatorio['alvos'].items():
+        linha = (
+            f"{nome:<13} {medicao['importacao_s']:7.3f}s importação {medicao['processo_s']:7.3f}s processo "
+            f"{medicao['modulos']:5d} módulos  {', '.join(medicao['pesadas']) or '-'}"
+        )
+        if nome in base and base[nome]['importacao_s']:
+            linha += f"  x{medicao['importacao_s'] / base[nome]['importacao_s']:.2f}"
+        print(linha)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Mede a partida a frio (importação) de cada ponto de entrada e quais bibliotecas pesadas ele carrega.'
+    )
+    parser.add_argument('--alvos', default=','.join(ALVOS), help=f"lista separada por vírgulas ({', '.join(ALVOS)})")
+    parser.add_argument('--repeticoes', type=int, default=5, help='processos medidos por alvo (vale a mediana)')
+    parser.add_argument('--saida', default='inicializacao.json', help='arquivo JSON do relatório')
+    parser.add_argument('--comparar', help='relatório anterior para comparar os tempos')
+    args = parser.parse_args()
+
+    alvos = args.alvos.split(',')
+    desconhecidos = [nome for nome in alvos if nome not in ALVOS]
+    if desconhecidos:
+        parser.error(f"Alvos desconhecidos: {desconhecidos}")
+
+    relatorio = executar(alvos, args.repeticoes)
+    with open(args.saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, indent=2)
+
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            anterior = json.load(arquivo)
+    imprimir(relatorio, anterior)
+    print(f"Relatório: {args.saida}")
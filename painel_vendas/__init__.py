@@ -0,0 +1 @@
+# Pacote com a lógica de dados do dashboard de vendas (carregamento, cache, consultas)
@@ -0,0 +1,239 @@
+import argparse
+import datetime
+import email.utils
+import functools
+import gzip
+import hashlib
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from painel_vendas.cache_resultados import cache
+from painel_vendas.carregamento import carregar_dataset
+from painel_vendas.consultas import criar_consulta
+from painel_vendas.filtros import STATUS_PADRAO, criar_filtros
+from painel_vendas.indice_bitmap import obter_indice_bitmap
+from painel_vendas.indice_tempo import obter_indice_tempo
+
+# Porta padrão do serviço (o Streamlit usa a 8501)
+PORTA = int(os.environ.get('PAINEL_API_PORTA', 8502))
+
+# Respostas menores que isso vão sem compressão (o gzip não compensa)
+GZIP_MINIMO = 1024
+
+
+def _lista(parametros, nome, padrao=None):
+    # Lista separada por vírgulas; ausente = padrão, 'todos'/'todas' = sem filtro
+    valor = parametros.get(nome)
+    if valor is None:
+        return padrao
+    if valor in ('todos', 'todas'):
+        return None
+    return [item for item in valor.split(',') if item]
+
+
+def _data(parametros, nome, padrao):
+    valor = parametros.get(nome)
+    if not valor:
+        return padrao
+    try:
+        return datetime.date.fromisoformat(valor)
+    except ValueError:
+        raise ValueError(f"Data inválida em '{nome}': {valor} (use AAAA-MM-DD)") from None
+
+
+def filtros_da_url(dataset, parametros):
+    # Mesmo estado de filtros do dashboard: período (inicio/fim, padrão o dataset todo),
+    # estados, categorias e status (padrão: entregues e cancelados, como na barra lateral)
+    indice_tempo = obter_indice_tempo(dataset)
+    inicio = _data(parametros, 'inicio', indice_tempo.data_min())
+    fim = _data(parametros, 'fim', indice_tempo.data_max())
+    if inicio > fim:
+        raise ValueError(f"'inicio' ({inicio}) depois de 'fim' ({fim})")
+    return criar_filtros(
+        inicio, fim,
+        estados=_lista(parametros, 'estados'),
+        categorias=_lista(parametros, 'categorias'),
+        status=_lista(parametros, 'status', STATUS_PADRAO),
+    )
+
+
+def _json(valor):
+    # DataFrames viram listas de registros; datas, no formato ISO
+    if isinstance(valor, pd.DataFrame):
+        return valor.to_dict(orient='records')
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, (datetime.date, pd.Timestamp)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo sem conversão para JSON: {type(valor).__name__}")
+
+
+def _codificar(conteudo):
+    # Corpo em JSON e a versão comprimida, calculados uma vez e guardados no cache de resultados
+    dados = json.dumps(conteudo, ensure_ascii=False, default=_json).encode('utf-8')
+    return dados, gzip.compress(dados, compresslevel=6) if len(dados) >= GZIP_MINIMO else None
+
+
+def resposta_metricas(dataset, filtros):
+    def calcular():
+        metricas = criar_consulta(dataset, filtros).metricas
+        return _codificar({
+            'versao': dataset.versao,
+            'filtros': filtros._asdict(),
+            'metricas': metricas._asdict(),
+        })
+
+    return cache.obter(('api:metricas', dataset.versao, filtros), calcular)
+
+
+def resposta_dataset(dataset):
+    # Versão, tamanho, intervalo de datas e valores possíveis de cada filtro
+    def calcular():
+        indice = obter_indice_bitmap(dataset)
+        indice_tempo = obter_indice_tempo(dataset)
+        return _codificar({
+            'versao': dataset.versao,
+            'linhas': len(dataset),
+            'data_min': indice_tempo.data_min(),
+            'data_max': indice_tempo.data_max(),
+            'estados': indice.valores('seller_state'),
+            'categorias': indice.valores('product_category_name'),
+            'status': indice.valores('order_status'),
+        })
+
+    return cache.obter(('api:dataset', dataset.versao), calcular)
+
+
+def etiqueta(dataset, *partes):
+    # ETag fraca (o mesmo conteúdo com ou sem gzip): versão do dataset + parâmetros normalizados
+    resumo = hashlib.sha1(repr(partes).encode()).hexdigest()[:16]
+    return f'W/"{dataset.versao}-{resumo}"'
+
+
+def modificado_em(dataset):
+    # Momento da versão do dataset: o arquivo colunar mais recente (base ou último lote anexado);
+    # sem arquivos (CSV ainda não convertido, modo em blocos), o momento da carga
+    if dataset.arquivos:
+        return int(max(os.path.getmtime(arquivo) for arquivo in dataset.arquivos))
+    return int(dataset.carregado_em)
+
+
+def nao_modificado(cabecalhos, etag, modificado):
+    # Requisição condicional (RFC 9110): If-None-Match tem precedência sobre If-Modified-Since
+    if_none_match = cabecalhos.get('If-None-Match')
+    if if_none_match is not None:
+        etiquetas = [item.strip().removeprefix('W/') for item in if_none_match.split(',')]
+        return '*' in etiquetas or etag.removeprefix('W/') in etiquetas
+    if_modified_since = cabecalhos.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            return modificado <= email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def aceita_gzip(cabecalhos):
+    for item in cabecalhos.get('Accept-Encoding', '').split(','):
+        codificacao, _, parametros = item.strip().partition(';')
+        if codificacao.strip() in ('gzip', '*'):
+            return parametros.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+class Manipulador(BaseHTTPRequestHandler):
+    # GET /dataset: versão e valores dos filtros; GET /metricas?inicio=&fim=&estados=&categorias=&status=:
+    # as mesmas métricas do dashboard para o estado de filtros. Sem corpo novo (304) enquanto a
+    # versão do dataset e os filtros forem os mesmos.
+    server_version = 'PainelVendas'
+
+    def do_GET(self):
+        self._responder(corpo=True)
+
+    def do_HEAD(self):
+        self._responder(corpo=False)
+
+    def _responder(self, corpo):
+        url = urlsplit(self.path)
+        parametros = dict(parse_qsl(url.query))
+        try:
+            # Relido a cada requisição (como a cada rerun): lotes anexados aparecem sem reiniciar
+            dataset = carregar_dataset()
+            if url.path == '/metricas':
+                filtros = filtros_da_url(dataset, parametros)
+                etag = etiqueta(dataset, 'metricas', filtros)
+                conteudo = functools.partial(resposta_metricas, dataset, filtros)
+            elif url.path == '/dataset':
+                etag = etiqueta(dataset, 'dataset')
+                conteudo = functools.partial(resposta_dataset, dataset)
+            else:
+                self._erro(404, f"Caminho desconhecido: {url.path} (use /metricas ou /dataset)", corpo)
+                return
+        except ValueError as erro:
+            self._erro(400, str(erro), corpo)
+            return
+
+        modificado = modificado_em(dataset)
+        cabecalhos = {
+            'ETag': etag,
+            'Last-Modified': email.utils.formatdate(modificado, usegmt=True),
+            # Sempre revalidar: a resposta muda quando um lote novo é anexado
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding',
+        }
+        if nao_modificado(self.headers, etag, modificado):
+            self._enviar(304, cabecalhos, None)
+            return
+
+        try:
+            dados, comprimido = conteudo()
+        except Exception as erro:
+            self.log_error('Erro ao calcular %s: %r', self.path, erro)
+            self._erro(500, repr(erro), corpo)
+            return
+        if comprimido is not None and aceita_gzip(self.headers):
+            dados = comprimido
+            cabecalhos['Content-Encoding'] = 'gzip'
+        cabecalhos['Content-Type'] = 'application/json; charset=utf-8'
+        cabecalhos['Content-Length'] = str(len(dados))
+        self._enviar(200, cabecalhos, dados if corpo else None)
+
+    def _erro(self, status, mensagem, corpo):
+        dados = json.dumps({'erro': mensagem}, ensure_ascii=False).encode('utf-8')
+        cabecalhos = {'Content-Type': 'application/json; charset=utf-8', 'Content-Length': str(len(dados))}
+        self._enviar(status, cabecalhos, dados if corpo else None)
+
+    def _enviar(self, status, cabecalhos, dados):
+        self.send_response(status)
+        for nome, valor in cabecalhos.items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        if dados:
+            self.wfile.write(dados)
+
+
+def servir(host='127.0.0.1', porta=PORTA):
+    # Uma thread por requisição; dataset, estruturas e caches são os do processo, como no dashboard
+    carregar_dataset()
+    servidor = ThreadingHTTPServer((host, porta), Manipulador)
+    print(f"Servindo em http://{host}:{porta}/metricas", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serviço HTTP (JSON) com as métricas do dashboard.')
+    parser.add_argument('--host', default='127.0.0.1', help='endereço (padrão: só a máquina local)')
+    parser.add_argument('--porta', type=int, default=PORTA, help='porta (padrão: PAINEL_API_PORTA ou 8502)')
+    args = parser.parse_args()
+
+    servir(args.host, args.porta)
@@ -0,0 +1,403 @@
+import streamlit as st
+
+# seaborn/matplotlib só são importados (em painel_vendas.graficos) quando o backend de gráficos
+# é o matplotlib; com o padrão (vega) o app não carrega nenhum dos dois
+from painel_vendas import instrumentacao
+from painel_vendas.carregamento import carregar_dataset
+from painel_vendas.comparacao import periodo, periodo_anterior
+from painel_vendas.consultas import criar_consulta
+from painel_vendas.exibicao import exibir
+from painel_vendas.filtros import criar_filtros
+from painel_vendas.indice_bitmap import obter_indice_bitmap
+from painel_vendas.indice_tempo import obter_indice_tempo
+from painel_vendas.instrumentacao import medido, secao
+from painel_vendas.tabela import TAMANHOS_PAGINA, contar_linhas, contar_paginas, pagina
+
+def definicao_parametros_graficos():
+
+    # Configurações Gerais (o estilo dos gráficos matplotlib fica em graficos.definir_estilo)
+    st.set_page_config(page_title='Análise de Vendas por Estado', layout='wide')
+    st.markdown(
+        """
+        <style>
+        .stApp {
+            background-color: #000000;
+            color: #C84C09;
+        }
+        .stButton>button {
+            background-color: #FF4B4B;
+            color: black;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True
+    )
+
+    return None
+
+@medido()
+def aplicar_filtros(dataset):
+    indice = obter_indice_bitmap(dataset)
+    indice_tempo = obter_indice_tempo(dataset)
+
+    # Side Bar
+    st.sidebar.header('Filtros')
+    st.sidebar.write("")
+
+    # Filtro de data com slider de range
+    st.sidebar.write("Selecione o intervalo de datas:")
+    data_min = indice_tempo.data_min()  # Data mínima do DataFrame (primeira linha, dataset ordenado)
+    data_max = indice_tempo.data_max()  # Data máxima do DataFrame (última linha)
+
+    # Slider de range para seleção de datas
+    if 'data_range' not in st.session_state:
+        st.session_state['data_range'] = (data_min, data_max)
+
+    data_range = st.sidebar.slider(
+        "Período",
+        min_value=data_min,
+        max_value=data_max,
+        value=st.session_state['data_range'],
+        key="slider_data_range"  # Chave única para o slider
+    )
+    st.session_state['data_range'] = data_range
+    data_inicio, data_fim = data_range  # Extrai as datas de início e fim
+    
+    st.sidebar.write("")
+
+    # Filtro de estados
+    lista_estados = indice.valores('seller_state')
+    lista_estados.insert(0, "Todos os estados")  # Adiciona a opção "Todos os estados"
+
+    if 'estados_selecionados' not in st.session_state:
+        st.session_state['estados_selecionados'] = ["Todos os estados"]
+
+    estados_selecionados = st.sidebar.multiselect(
+        'Selecione um Estado',
+        options=lista_estados,
+        default=st.session_state['estados_selecionados'],
+        key="multiselect_estados"  # Chave única para o multiselect
+    )
+
+    selecionar_todos_estados = st.sidebar.checkbox(
+        "Selecionar todos os estados",
+        value=("Todos os estados" in estados_selecionados),
+        key="checkbox_estados"  # Chave única para o checkbox
+    )
+
+
+    if selecionar_todos_estados:
+        if estados_selecionados != ["Todos os estados"]:
+            estados_selecionados = ["Todos os estados"]
+            st.session_state['estados_selecionados'] = estados_selecionados
+            st.rerun()
+    else:
+        if "Todos os estados" in estados_selecionados and len(estados_selecionados) > 1:
+            estados_selecionados.remove("Todos os estados")
+            st.session_state['estados_selecionados'] = estados_selecionados
+            st.rerun()
+
+    if "Todos os estados" in estados_selecionados:
+        estados_para_filtro = None  # sem filtro de estado
+    else:
+        estados_para_filtro = estados_selecionados
+
+    st.sidebar.write("")
+
+    # Filtro de categorias
+    lista_categorias = indice.valores('product_category_name')
+    lista_categorias.insert(0, "Todas as categorias")  # Adiciona a opção "Todas as categorias"
+
+    if 'categorias_selecionadas' not in st.session_state:
+        st.session_state['categorias_selecionadas'] = ["Todas as categorias"]
+
+    categorias_selecionadas = st.sidebar.multiselect(
+        'Selecione uma categoria de produto',
+        options=lista_categorias,
+        default=st.session_state['categorias_selecionadas'],
+        key="multiselect_categorias"  # Chave única para o multiselect
+    )
+
+    selecionar_todas_categorias = st.sidebar.checkbox(
+        "Selecionar todas as categorias",
+        value=("Todas as categorias" in categorias_selecionadas),
+        key="checkbox_categorias"  # Chave única para o checkbox
+    )
+
+    st.write("")
+
+    # Filtro de status (Entregue/Cancelado)
+    st.sidebar.write("Filtrar por status do pedido:")
+    status_entregue = st.sidebar.checkbox("Entregue", value=True, key="checkbox_entregue")
+    status_cancelado = st.sidebar.checkbox("Cancelado", value=True, key="checkbox_cancelado")
+    # Filtro de status
+    status_filtro = []
+    if status_entregue:
+        status_filtro.append("delivered")
+    if status_cancelado:
+        status_filtro.append("canceled")
+
+    if not status_filtro:  # Sem status selecionado o filtro de status não é aplicado
+        st.sidebar.warning("Selecione pelo menos um status para filtrar.")
+
+
+    if selecionar_todas_categorias:
+        if categorias_selecionadas != ["Todas as categorias"]:
+            categorias_selecionadas = ["Todas as categorias"]
+            st.session_state['categorias_selecionadas'] = categorias_selecionadas
+            st.rerun()
+    else:
+        if "Todas as categorias" in categorias_selecionadas and len(categorias_selecionadas) > 1:
+            categorias_selecionadas.remove("Todas as categorias")
+            st.session_state['categorias_selecionadas'] = categorias_selecionadas
+            st.rerun()
+
+    if "Todas as categorias" in categorias_selecionadas:
+        categorias_para_filtro = None  # sem filtro de categoria
+    else:
+        categorias_para_filtro = categorias_selecionadas
+
+    # Estado normalizado dos filtros; as visões consultam o cubo a partir dele
+    return criar_filtros(
+        data_inicio,
+        data_fim,
+        estados=estados_para_filtro,
+        categorias=categorias_para_filtro,
+        status=status_filtro or None
+    )
+
+@medido()
+def big_numbers(metricas):
+    st.subheader('Indicadores Gerais')
+
+    total_vendas = metricas.total_vendas
+    total_customers = metricas.clientes_unicos
+    total_sellers = metricas.vendedores_unicos
+
+    # Criar 3 colunas
+    col1, col2, col3 = st.columns(3) # posso botar uma lista [] com as proporções : [1, 2, 1]
+
+    col1.metric('Vendas Totais', f"R${total_vendas:,.2f}")
+    col2.metric('Clientes Únicos', f"{total_customers:,.0f}")
+    col3.metric('Vendedores Únicos', f"{total_sellers:,.0f}")
+
+    return None
+
+@medido()
+def visoes_gerais(metricas):
+    st.subheader('Visao Geral das Vendas por Estado')
+
+    col1, col2, col3 = st.columns(3)
+
+    # Gráficos desenhados pelo backend configurado (PAINEL_GRAFICOS: vega no navegador ou matplotlib)
+
+    # Grafico 1
+    vendas_estados = metricas.vendas_estado
+    exibir(
+        col1, 'barras', vendas_estados, x='customer_state', y='total_price',
+        titulo='Vendas Totais por Estado', xlabel='Estado', ylabel='Vendas (R$)'
+    )
+
+    # Grafico 2
+    clientes_estado = metricas.clientes_estado
+    exibir(
+        col2, 'barras', clientes_estado, x='customer_state', y='customer_unique_id',
+        titulo='Clientes Únicos por Estado', xlabel='Estado', ylabel='Vendas (R$)'
+    )
+
+    # Grafico 3
+    vendedores_estado = metricas.vendedores_estado
+    exibir(
+        col3, 'barras', vendedores_estado, x='seller_state', y='seller_id',
+        titulo='Vendedores Únicos por Estado', xlabel='Estado', ylabel='Vendas (R$)'
+    )
+    
+    return None
+
+@medido()
+def visoes_temporais(metricas):
+    st.subheader('Visão Temporal por Estado')
+
+    col1, col2, col3 = st.columns(3)
+
+    vendas_temporal = metricas.vendas_mes
+    exibir(
+        col1, 'linha', vendas_temporal, x='order_purchase_year_month', y='total_price',
+        titulo='Vendas (R$) por mês', xlabel='Ano-mês', ylabel='Vendas (R$)'
+    )
+
+    clientes_temporal = metricas.clientes_mes
+    exibir(
+        col2, 'linha', clientes_temporal, x='order_purchase_year_month', y='customer_unique_id',
+        titulo='Clientes Únicos por mês', xlabel='Ano-mês', ylabel='Clientes Únicos'
+    )
+
+    vendedores_temporal = metricas.vendedores_mes
+    exibir(
+        col3, 'linha', vendedores_temporal, x='order_purchase_year_month', y='seller_id',
+        titulo='Vendedores Únicos por mês', xlabel='Ano-mês', ylabel='Vendedores Únicos'
+    )
+
+    return None
+    
+@medido()
+def tabela_paginada(consulta, visao='clientes'):
+    # Tabela paginada no servidor: só a página visível e as colunas escolhidas vão para o navegador
+    df = consulta.dataset.df
+    if df is None:
+        st.info("Modo em blocos (PAINEL_EM_BLOCOS): as linhas não ficam em memória, só os agregados.")
+        return
+    todas_colunas = list(df.columns)
+
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    colunas = col1.multiselect('Colunas', options=todas_colunas, default=todas_colunas, key='tabela_colunas')
+    ordenar_por = col2.selectbox('Ordenar por', options=['(sem ordenação)'] + todas_colunas, key='tabela_ordem')
+    crescente = col3.radio('Ordem', options=['Crescente', 'Decrescente'], key='tabela_sentido') == 'Crescente'
+    tamanho = col4.selectbox('Linhas por página', options=TAMANHOS_PAGINA, key='tabela_tamanho')
+
+    if ordenar_por == '(sem ordenação)':
+        ordenar_por = None
+    linhas = consulta.linhas(visao, ordenar_por=ordenar_por, crescente=crescente)
+    total = contar_linhas(linhas)
+    n_paginas = contar_paginas(linhas, tamanho)
+
+    # Volta para uma página válida quando o filtro diminui o número de linhas
+    st.session_state['tabela_pagina'] = min(st.session_state.get('tabela_pagina', 1), n_paginas)
+    numero = st.number_input('Página', min_value=1, max_value=n_paginas, step=1, key='tabela_pagina')
+
+    st.dataframe(pagina(df, linhas, colunas or todas_colunas, numero, tamanho), hide_index=True)
+    st.caption(f"{total:,} linhas · página {numero} de {n_paginas}")
+
+# Como fragmento, trocar página, ordem ou colunas reexecuta só a tabela, não o script inteiro
+tabela_paginada = st.fragment(tabela_paginada)
+
+@medido()
+def visoes_categoria(metricas, consulta):
+    
+    st.write("### Análise de Categorias")
+
+    # Primeira Parte: Exibir a fatia dos dados considerada (paginada)
+    st.write("#### Fatia dos Dados Considerada")
+    tabela_paginada(consulta)
+
+    # Segunda Parte: Gráfico de barras com as categorias selecionadas e total_price
+    st.write("#### Gráfico de Vendas por Categoria (Filtre para uma melhor visualização)")
+
+    # Total_price por categoria (já ordenado) e média das categorias vêm das métricas do rerun
+    df_categorias = metricas.vendas_categoria
+    media_todas_categorias = metricas.media_categorias
+
+    # Gráfico de barras com a linha da média
+    exibir(st, 'barras_categoria', df_categorias, media=media_todas_categorias)
+
+@medido()
+def insights(consulta):
+    # Gráfico 1: Comportamento das Top 10 Categorias no 1º Semestre de 2017 e 2018
+    st.write("#### Comportamento das Top 10 Categorias (1º Semestre 2017 vs 1º Semestre 2018)")
+    st.write("##### Crescimento de vendas das principais categorias quando comparado os períodos.")
+
+    # Top 10 categorias de cada semestre (união), com os totais dos dois períodos lado a lado,
+    # ordenadas pelo desempenho de 2018 (decrescente). Comparação ano contra ano: o 1º semestre
+    # de 2018 e o mesmo intervalo um ano antes
+    semestre = periodo('semestre', 2018, 1, rotulo='2018')
+    df_comparacao = consulta.comparacao(
+        periodo_anterior(semestre, rotulo='2017'),
+        semestre,
+        dimensao='product_category_name',
+        top_n=10
+    )
+
+    # Criar o gráfico de barras lado a lado
+    exibir(st, 'comparacao_periodos', df_comparacao, titulo='Top 10 Categorias: 1º Semestre 2017 vs 1º Semestre 2018')
+
+    # Gráfico 2: Relação entre product_photos_qty e quantidade de pedidos únicos
+    st.write("#### Relação entre Quantidade de Fotos e Pedidos Únicos")
+    st.write("##### Não há uma relação clara entre a quantidade de fotos do produto com o número de pedidos, indicando que não é um fator determinante. Nota-se também que grande parte dos produtos possuem poucas fotos.")
+    # Agrupar por product_photos_qty e contar a quantidade de pedidos únicos (order_id)
+    if consulta.dataset.df is None:
+        st.info("Modo em blocos (PAINEL_EM_BLOCOS): este gráfico precisa das linhas, que não ficam em memória.")
+        return
+    df_photos = consulta.pedidos_por_fotos()
+
+    # Gráfico barras + kde (qtd de fotos e vendas)
+    exibir(st, 'histograma_fotos', df_photos)
+
+def aba_analise_geral(consulta):
+    # Métricas calculadas uma única vez por rerun (consulta.metricas é memorizado)
+    metricas = consulta.metricas
+
+    # Título
+    st.title('Dashboard de Análise de Vendas por Estado')
+
+    # Big Numbers
+    big_numbers(metricas)
+
+    # Visões Gerais
+    visoes_gerais(metricas)
+
+    # Visoes Temporais (mês) para o Estado Selecionado
+    visoes_temporais(metricas)
+
+def aba_analise_categorias(consulta):
+    metricas = consulta.metricas
+
+    # Título
+    st.title('Dashboard de Análise por Categorias')
+
+    # # Big Numbers
+    big_numbers(metricas)
+
+    # # Visões Gerais
+    visoes_categoria(metricas, consulta)
+
+def aba_insights(consulta):
+    st.header("Insights")
+
+    insights(consulta)
+
+# Conteúdo de cada aba, na ordem das abas (também usado pelo relatório estático)
+ABAS = {
+    "Análise Geral": aba_analise_geral,
+    "Análise Categorias": aba_analise_categorias,
+    "Insights": aba_insights,
+}
+
+def main():
+    # Um rerun do dashboard (chamado pelo script do Streamlit, dashboard_final.py)
+    definicao_parametros_graficos()
+
+    # Instrumentação (PAINEL_INSTRUMENTACAO=1 ou ?dev=1): tempo e linhas de cada seção do rerun.
+    # Modo memória (PAINEL_MEMORIA=1): também bytes alocados por seção, tamanho dos DataFrames,
+    # figuras abertas e aviso de crescimento entre reruns
+    instrumentar = instrumentacao.ativa(st.query_params)
+    if instrumentar:
+        instrumentacao.iniciar(memoria=instrumentacao.MEMORIA)
+
+    try:
+        # Baixa (ou reaproveita do cache local) e lê o dataset uma única vez por processo.
+        # Para usar um arquivo local: PAINEL_DADOS=../datasets/order_items_cleaned.csv
+        with secao('carregar_dataset') as trecho:
+            dataset = carregar_dataset()
+            trecho.linhas = len(dataset)
+    
+        # Side Bar (Filtros)
+        filtros = aplicar_filtros(dataset)
+        consulta = criar_consulta(dataset, filtros)
+
+        # Criando abas. A aba selecionada fica no session_state ('aba') e trocar de aba gera um rerun:
+        # só o conteúdo da aba aberta é calculado; as demais ficam para quando forem abertas
+        # (e aí saem do cache de resultados se os filtros não mudaram)
+        abas = st.tabs(list(ABAS), key='aba', on_change='rerun')
+
+        for aba, conteudo in zip(abas, ABAS.values()):
+            if aba.open:
+                with aba:
+                    conteudo(consulta)
+
+        # Painel de desenvolvimento com as seções medidas neste rerun
+        if instrumentar:
+            instrumentacao.exibir_painel(st.sidebar, instrumentacao.finalizar())
+    finally:
+        # Rerun interrompido antes do painel (st.rerun, st.stop, exceção): o modo memória é
+        # liberado para as outras sessões
+        instrumentacao.abandonar()
\ No newline at end of file
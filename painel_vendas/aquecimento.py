@@ -0,0 +1,66 @@
+import argparse
+import os
+import sys
+import time
+
+from painel_vendas.carregamento import carregar_dataset
+from painel_vendas.cubo import consolidar, obter_cubo
+
+SCRIPT_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dashboard_final.py')
+
+
+def estados_mais_vendidos(dataset, n):
+    # Estados com mais vendas no período todo: as visões por estado mais prováveis de serem abertas
+    vendas = consolidar(obter_cubo(dataset).celulas, 'customer_state')
+    return list(vendas.nlargest(n, 'total_price')['customer_state'])
+
+
+def aquecer(script=SCRIPT_PADRAO, n_estados=5):
+    # Executa o dashboard sem navegador (streamlit.testing), abrindo cada aba, para o filtro
+    # padrão ("Todos os estados / Todas as categorias") e para os 'n_estados' estados com mais
+    # vendas. Os caches (dataset, índices, resultados, gráficos) são do processo: rodando no
+    # mesmo processo do servidor, o primeiro usuário já encontra tudo calculado.
+    # Retorna o tempo (s) de cada execução, por (estado, aba).
+    from streamlit.testing.v1 import AppTest
+
+    # As abas do próprio dashboard, na ordem de st.tabs (a aba aberta fica em session_state['aba'])
+    from painel_vendas.app import ABAS
+
+    visoes = [None] + estados_mais_vendidos(carregar_dataset(), n_estados)
+    tempos = {}
+    for estado in visoes:
+        for aba in ABAS:
+            app = AppTest.from_file(script, default_timeout=600)
+            app.session_state['aba'] = aba
+            if estado is not None:
+                app.session_state['estados_selecionados'] = [estado]
+            inicio = time.perf_counter()
+            app.run()
+            if app.exception:
+                raise RuntimeError(f"Erro ao aquecer {estado or 'Todos os estados'} / {aba}: {app.exception[0].value}")
+            tempos[(estado or 'Todos os estados', aba)] = time.perf_counter() - inicio
+    return tempos
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Pré-calcula a visão padrão do dashboard (e as visões dos estados com mais vendas).'
+    )
+    parser.add_argument('--script', default=SCRIPT_PADRAO, help='script do dashboard (padrão: dashboard_final.py)')
+    parser.add_argument('--estados', type=int, default=5, help='quantos estados aquecer além da visão padrão')
+    parser.add_argument(
+        '--servir', action='store_true',
+        help='depois de aquecer, sobe o servidor Streamlit neste mesmo processo (argumentos extras vão para o streamlit run)'
+    )
+    args, extras = parser.parse_known_args()
+
+    inicio = time.perf_counter()
+    for (estado, aba), tempo in aquecer(args.script, args.estados).items():
+        print(f"{estado:>20} | {aba:<20} {tempo:6.2f}s")
+    print(f"Aquecimento concluído em {time.perf_counter() - inicio:.1f}s")
+
+    if args.servir:
+        from streamlit.web import cli
+
+        sys.argv = ['streamlit', 'run', args.script] + extras
+        sys.exit(cli.main())
@@ -0,0 +1,301 @@
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from painel_vendas.cubo import DIMENSOES, Cubo
+from painel_vendas.dataset import Dataset
+from painel_vendas.distintos import ERRO_HLL, IndiceDistintos, _maiores_por_chave, _precisao_hll, _registradores_hll
+from painel_vendas.formato_colunar import aplicar_esquema, formato_do_arquivo
+from painel_vendas.indice_tempo import COLUNA_TEMPO
+
+# Modo em blocos: o arquivo é lido em partes de tamanho limitado e só os agregados (cubo por
+# dia e contagens de distintos em HyperLogLog) ficam em memória. Serve bases maiores que a RAM;
+# a tabela de linhas e os gráficos que dependem das linhas ficam indisponíveis.
+EM_BLOCOS = os.environ.get('PAINEL_EM_BLOCOS', '') not in ('', '0')
+
+# Memória (MB) que a leitura em blocos pode usar: define o tamanho de cada bloco
+MEMORIA_MAXIMA_MB = int(os.environ.get('PAINEL_MEMORIA_MAXIMA_MB', 512))
+
+# Fração do limite ocupada pelo bloco lido; o resto fica para as cópias temporárias
+# (agrupamento, hashes) e para os agregados acumulados
+FRACAO_BLOCO = 0.25
+
+COLUNAS_DISTINTOS = ['customer_unique_id', 'seller_id']
+
+# O ano-mês das células sai do dia, então não precisa ser lido
+DIMENSOES_LIDAS = [dimensao for dimensao in DIMENSOES if dimensao != 'order_purchase_year_month']
+COLUNAS_LIDAS = [COLUNA_TEMPO, 'total_price'] + DIMENSOES_LIDAS + COLUNAS_DISTINTOS
+
+# Chave de cada célula em um int64: dia (dias desde 1970) nos bits altos e o código de cada
+# dimensão lida em BITS_DIMENSAO bits
+BITS_DIMENSAO = 10
+
+
+def ler_blocos(caminho, linhas_por_bloco, colunas=COLUNAS_LIDAS):
+    # Blocos de até 'linhas_por_bloco' linhas, sem carregar o arquivo inteiro
+    formato = formato_do_arquivo(caminho)
+    if formato == 'parquet':
+        import pyarrow.parquet as pq
+
+        arquivo = pq.ParquetFile(caminho, memory_map=True)
+        for lote in arquivo.iter_batches(batch_size=linhas_por_bloco, columns=colunas):
+            yield lote.to_pandas()
+    elif formato == 'feather':
+        import pyarrow.feather as feather
+
+        tabela = feather.read_table(caminho, columns=colunas, memory_map=True)
+        for lote in tabela.to_batches(max_chunksize=linhas_por_bloco):
+            yield lote.to_pandas()
+    else:
+        yield from pd.read_csv(caminho, usecols=colunas, chunksize=linhas_por_bloco)
+
+
+def calcular_linhas_por_bloco(caminho, memoria_maxima_mb=MEMORIA_MAXIMA_MB):
+    # Estima o tamanho de uma linha em memória por uma amostra do início do arquivo
+    amostra = next(ler_blocos(caminho, 10_000), None)
+    if amostra is None or amostra.empty:
+        return 10_000
+    por_linha = amostra.memory_usage(deep=True, index=False).sum() / len(amostra)
+    return max(10_000, int(memoria_maxima_mb * 2 ** 20 * FRACAO_BLOCO / por_linha))
+
+
+class ResumoTempo:
+    # Faz o papel do IndiceTempo para os filtros do dashboard (datas mínima e máxima)
+
+    def __init__(self, inicio, fim):
+        self.inicio = inicio
+        self.fim = fim
+
+    def data_min(self):
+        return self.inicio.date()
+
+    def data_max(self):
+        return self.fim.date()
+
+
+class ResumoDimensoes:
+    # Faz o papel do IndiceBitmap para os filtros do dashboard (valores de cada dimensão)
+
+    def __init__(self, celulas):
+        self.celulas = celulas
+
+    def valores(self, coluna):
+        return list(self.celulas[coluna].cat.categories)
+
+
+class CuboAgregado(Cubo):
+    # Cubo montado em blocos, sem as linhas. As células também são separadas por dia ('dia'),
+    # então os meses cortados pelo filtro de datas saem das próprias células.
+
+    def __init__(self, celulas, meses):
+        self.df = None
+        self.celulas = celulas
+        self.celula_da_linha = np.zeros(0, dtype=np.int64)
+        self.meses = meses
+        self.tempo = None
+
+    def anexar(self, dataset, inicio):
+        raise ValueError("O cubo do modo em blocos não recebe linhas novas; ele é remontado a partir dos arquivos")
+
+    def selecionar(self, filtros, visao):
+        inteiros, parciais = self._meses_do_intervalo(filtros.data_inicio, filtros.data_fim)
+        celulas = self._fatia(filtros, visao, inteiros).index.to_numpy()
+        if parciais:
+            fatia = self._fatia(filtros, visao, parciais)
+            no_intervalo = (fatia['dia'] >= pd.Timestamp(filtros.data_inicio)) & (
+                fatia['dia'] <= pd.Timestamp(filtros.data_fim)
+            )
+            celulas = np.sort(np.concatenate([celulas, fatia.index[no_intervalo].to_numpy()]))
+        return celulas, np.array([], dtype=np.int64)
+
+
+class DistintosAgregado(IndiceDistintos):
+    # Contagem de distintos em HyperLogLog montada em blocos (sem codificação por linha)
+
+    def __init__(self, coluna, p, chaves, posicoes, n_celulas):
+        self.modo = 'hll'
+        self.coluna = coluna
+        self.p = p
+        self.m = 1 << p
+        self.valores = (chaves % self.m).astype(np.uint16)
+        self.posicoes = posicoes
+        self.ptr = np.searchsorted(chaves // self.m, np.arange(n_celulas + 1))
+
+    def anexar(self, dataset, inicio):
+        raise ValueError("As contagens do modo em blocos não recebem linhas novas; elas são remontadas a partir dos arquivos")
+
+
+class DatasetAgregado(Dataset):
+    # Dataset servido só pelos agregados: 'df' é None e as estruturas derivadas já vêm prontas.
+    # 'esquema' (DataFrame vazio com as colunas e tipos) serve para validar lotes novos.
+
+    def __init__(self, derivados, n_linhas, esquema, versao, origem=None):
+        super().__init__(None, versao, origem)
+        self.n_linhas = n_linhas
+        self.esquema = esquema
+        self._derivados.update(derivados)
+
+    def derivado(self, nome, construtor):
+        if nome not in self._derivados:
+            raise ValueError(f"'{nome}' precisa das linhas do dataset, que não ficam em memória no modo em blocos")
+        return self._derivados[nome]
+
+    def anexar(self, delta, versao, arquivo=None):
+        raise ValueError("No modo em blocos os lotes novos são lidos junto com a base (carregar_dataset)")
+
+    def __len__(self):
+        return self.n_linhas
+
+
+class AgregadorEmBlocos:
+    # Acumula, bloco a bloco, as somas por célula (dia x dimensões) e os pares
+    # (célula, registrador) do HyperLogLog de cada coluna de distintos.
+    # As células ganham um número na ordem em que aparecem e nunca mudam de número.
+
+    def __init__(self, memoria_maxima_mb=MEMORIA_MAXIMA_MB, erro=ERRO_HLL):
+        self.limite_bytes = memoria_maxima_mb * 2 ** 20
+        self.p = _precisao_hll(erro)
+        self.m = 1 << self.p
+        self.valores = {dimensao: pd.Index([], dtype=object) for dimensao in DIMENSOES_LIDAS}
+        self.chaves = pd.Index([], dtype=np.int64)
+        self.total_price = np.zeros(0)
+        self.qtd_itens = np.zeros(0, dtype=np.int64)
+        self.pares = {coluna: (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8)) for coluna in COLUNAS_DISTINTOS}
+        self.pendentes = {coluna: [] for coluna in COLUNAS_DISTINTOS}
+        self.n_linhas = 0
+        self.inicio = None
+        self.fim = None
+        self.esquema = None
+        self._avisado = False
+
+    def _codigos(self, dimensao, unicos):
+        # Código de cada valor da dimensão (valores novos entram no fim)
+        valores = self.valores[dimensao]
+        codigos = valores.get_indexer(unicos)
+        if (codigos < 0).any():
+            valores = self.valores[dimensao] = valores.append(pd.Index(unicos[codigos < 0], dtype=object))
+            codigos = valores.get_indexer(unicos)
+        if len(valores) >= 1 << BITS_DIMENSAO:
+            raise ValueError(f"{dimensao} tem mais de {(1 << BITS_DIMENSAO) - 1} valores, acima do suportado pelo modo em blocos")
+        return codigos
+
+    def _celulas(self, chaves):
+        # Número de cada célula, criando as que ainda não existem
+        numeros = self.chaves.get_indexer(chaves)
+        novas = numeros < 0
+        if novas.any():
+            numeros[novas] = len(self.chaves) + np.arange(int(novas.sum()))
+            self.chaves = self.chaves.append(pd.Index(chaves[novas]))
+            self.total_price = np.concatenate([self.total_price, np.zeros(int(novas.sum()))])
+            self.qtd_itens = np.concatenate([self.qtd_itens, np.zeros(int(novas.sum()), dtype=np.int64)])
+        return numeros
+
+    def adicionar(self, bloco):
+        if bloco.empty:
+            return
+        datas = pd.to_datetime(bloco[COLUNA_TEMPO])
+        if datas.isna().any():
+            raise ValueError(f"Valores ausentes em {COLUNA_TEMPO}")
+        self.inicio = datas.min() if self.inicio is None else min(self.inicio, datas.min())
+        self.fim = datas.max() if self.fim is None else max(self.fim, datas.max())
+        self.n_linhas += len(bloco)
+
+        chave = datas.to_numpy(dtype='datetime64[D]').astype(np.int64)
+        for dimensao in DIMENSOES_LIDAS:
+            codigos, unicos = pd.factorize(bloco[dimensao], use_na_sentinel=False)
+            chave = (chave << BITS_DIMENSAO) | self._codigos(dimensao, np.asarray(unicos, dtype=object))[codigos]
+        chaves, celula_da_linha = np.unique(chave, return_inverse=True)
+        numeros = self._celulas(chaves)
+        self.total_price[numeros] += np.bincount(celula_da_linha, weights=bloco['total_price'].to_numpy(dtype=np.float64))
+        self.qtd_itens[numeros] += np.bincount(celula_da_linha)
+
+        celula_da_linha = numeros[celula_da_linha].astype(np.int64)
+        for coluna in COLUNAS_DISTINTOS:
+            codigos, unicos = pd.factorize(bloco[coluna])
+            registradores, posicoes = _registradores_hll(pd.util.hash_array(np.asarray(unicos, dtype=object)), self.p)
+            validas = codigos >= 0
+            self.pendentes[coluna].append(_maiores_por_chave(
+                celula_da_linha[validas] * self.m + registradores[codigos[validas]], posicoes[codigos[validas]]
+            ))
+        if self._bytes_pendentes() > self.limite_bytes * FRACAO_BLOCO:
+            self._compactar()
+        self._verificar_limite()
+
+    def _bytes_pendentes(self):
+        return sum(chaves.nbytes + posicoes.nbytes for lista in self.pendentes.values() for chaves, posicoes in lista)
+
+    def _compactar(self):
+        # Junta os pares pendentes aos acumulados, guardando a maior posição de cada (célula, registrador)
+        for coluna, pendentes in self.pendentes.items():
+            if pendentes:
+                chaves, posicoes = zip(self.pares[coluna], *pendentes)
+                self.pares[coluna] = _maiores_por_chave(np.concatenate(chaves), np.concatenate(posicoes))
+                pendentes.clear()
+
+    def _verificar_limite(self):
+        acumulado = (
+            self.chaves.nbytes + self.total_price.nbytes + self.qtd_itens.nbytes +
+            sum(chaves.nbytes + posicoes.nbytes for chaves, posicoes in self.pares.values())
+        )
+        if acumulado > self.limite_bytes and not self._avisado:
+            self._avisado = True
+            warnings.warn(
+                f"Os agregados já ocupam {acumulado / 2 ** 20:,.0f} MB, acima de PAINEL_MEMORIA_MAXIMA_MB "
+                f"({self.limite_bytes / 2 ** 20:,.0f} MB): o limite só vale para os blocos lidos."
+            )
+
+    def _montar_celulas(self):
+        chaves = self.chaves.to_numpy()
+        colunas = {}
+        for dimensao in reversed(DIMENSOES_LIDAS):
+            valores = self.valores[dimensao]
+            categorias = sorted(v for v in valores if not pd.isna(v))
+            codigos = pd.Index(categorias).get_indexer(valores)  # valores sem dado -> -1
+            colunas[dimensao] = pd.Categorical.from_codes(codigos[chaves & ((1 << BITS_DIMENSAO) - 1)], categories=categorias)
+            chaves = chaves >> BITS_DIMENSAO
+
+        dia = chaves.astype('datetime64[D]').astype('datetime64[s]')
+        mes = pd.Series(dia).dt.strftime('%Y-%m')
+        celulas = pd.DataFrame({'order_purchase_year_month': pd.Categorical(mes, categories=sorted(mes.unique()))})
+        for dimensao in DIMENSOES_LIDAS:
+            celulas[dimensao] = colunas[dimensao]
+        celulas['total_price'] = self.total_price
+        celulas['qtd_itens'] = self.qtd_itens
+        celulas['dia'] = dia
+        return celulas
+
+    def dataset(self, versao, origem=None):
+        # Dataset com o cubo, as contagens de distintos e os resumos usados pelos filtros
+        self._compactar()
+        celulas = self._montar_celulas()
+        periodos = pd.PeriodIndex(celulas['order_purchase_year_month'].cat.categories, freq='M')
+        meses = pd.DataFrame(
+            {'inicio': periodos.start_time.date, 'fim': periodos.end_time.date},
+            index=celulas['order_purchase_year_month'].cat.categories,
+        )
+        derivados = {
+            'cubo': CuboAgregado(celulas, meses),
+            'indice_tempo': ResumoTempo(self.inicio, self.fim),
+            'indice_bitmap': ResumoDimensoes(celulas),
+        }
+        for coluna, (chaves, posicoes) in self.pares.items():
+            derivados['distintos_' + coluna] = DistintosAgregado(coluna, self.p, chaves, posicoes, len(celulas))
+        return DatasetAgregado(derivados, self.n_linhas, self.esquema, versao, origem)
+
+
+def agregar_em_blocos(caminhos, versao, origem=None, memoria_maxima_mb=MEMORIA_MAXIMA_MB):
+    # Lê cada arquivo (base e lotes anexados, na ordem) uma única vez, em blocos
+    if not caminhos:
+        raise ValueError("Nenhum arquivo para agregar")
+    agregador = AgregadorEmBlocos(memoria_maxima_mb)
+    # Colunas e tipos da base (amostra pequena), para validar lotes novos sem ler a base inteira
+    amostra = next(ler_blocos(caminhos[0], 1000, colunas=None))
+    agregador.esquema = aplicar_esquema(amostra).iloc[:0]
+    for caminho in caminhos:
+        for bloco in ler_blocos(caminho, calcular_linhas_por_bloco(caminho, memoria_maxima_mb)):
+            agregador.adicionar(bloco)
+    if agregador.n_linhas == 0:
+        raise ValueError(f"{caminhos[0]} não tem linhas")
+    return agregador.dataset(versao, origem)
@@ -0,0 +1,88 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Limite de memória do cache de resultados (MB), compartilhado por todas as sessões do processo
+LIMITE_MB = int(os.environ.get('PAINEL_CACHE_RESULTADOS_MB', 256))
+
+
+def tamanho_em_bytes(valor):
+    # Estimativa do espaço ocupado por um resultado guardado no cache
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        tamanho = valor.memory_usage(deep=True, index=True)
+        return int(tamanho.sum() if isinstance(valor, pd.DataFrame) else tamanho)
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamanho_em_bytes(v) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamanho_em_bytes(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheResultados:
+    # Cache LRU limitado por bytes. As chaves incluem a versão do dataset e o estado
+    # normalizado dos filtros, então a mesma combinação é calculada uma única vez no processo.
+    # Os valores são compartilhados entre sessões: quem recebe não deve alterá-los.
+
+    def __init__(self, limite_bytes):
+        self.limite_bytes = limite_bytes
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.descartes = 0
+        self.bytes_guardados = 0  # acumulado de tudo o que já entrou (não diminui com descartes)
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave, calcular):
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave][0]
+            self.falhas += 1
+
+        # Calcula fora do lock para não bloquear as outras sessões
+        valor = calcular()
+        tamanho = tamanho_em_bytes(valor)
+        if tamanho > self.limite_bytes:
+            return valor  # grande demais para guardar
+
+        with self._lock:
+            if chave not in self._itens:
+                self._itens[chave] = (valor, tamanho)
+                self.bytes_usados += tamanho
+                self.bytes_guardados += tamanho
+            while self.bytes_usados > self.limite_bytes:
+                _, (_, tamanho_antigo) = self._itens.popitem(last=False)
+                self.bytes_usados -= tamanho_antigo
+                self.descartes += 1
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self.bytes_usados = 0
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'bytes': self.bytes_usados,
+                'limite_bytes': self.limite_bytes,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'descartes': self.descartes,
+                'bytes_guardados': self.bytes_guardados,
+                'taxa_acerto': self.acertos / total if total else 0.0,
+            }
+
+
+# Instância única do processo (o Streamlit roda todas as sessões no mesmo processo)
+cache = CacheResultados(LIMITE_MB * 1024 * 1024)
@@ -0,0 +1,316 @@
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import warnings
+
+import pandas as pd
+
+from painel_vendas.blocos import EM_BLOCOS, agregar_em_blocos
+from painel_vendas.dataset import Dataset
+from painel_vendas.formato_colunar import (
+    aplicar_esquema, formato_do_arquivo, gravar_colunar, ler_colunar, validar_delta
+)
+from painel_vendas.indice_tempo import ordenar_por_tempo
+
+URL_DADOS = "https://drive.google.com/uc?id=1PgdkcfZUvW_IyG5Z4ZXH_AMKNgAE__c-"
+
+# Diretório do cache local (pode ser trocado pela variável de ambiente PAINEL_CACHE_DIR)
+DIRETORIO_CACHE = os.environ.get(
+    'PAINEL_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'painel_vendas')
+)
+
+# De quanto em quanto tempo (segundos) a origem remota é baixada de novo para ver se mudou
+INTERVALO_VERIFICACAO = int(os.environ.get('PAINEL_INTERVALO_VERIFICACAO', 6 * 60 * 60))
+
+TAMANHO_BLOCO = 1024 * 1024
+
+# Datasets já lidos neste processo, indexados pelo hash do conteúdo
+_datasets = {}
+_lock = threading.Lock()
+
+# Objetos do cache cujo hash já foi conferido neste processo: (caminho, tamanho, mtime).
+# Não depende de _datasets, que depois de anexar um lote só guarda a versão com os lotes.
+_verificados = set()
+
+
+def calcular_hash(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _caminho_manifesto(diretorio_cache):
+    return os.path.join(diretorio_cache, 'manifesto.json')
+
+
+def _caminho_objeto(diretorio_cache, sha):
+    # Cache endereçado por conteúdo: o nome do arquivo é o próprio hash
+    return os.path.join(diretorio_cache, 'objetos', sha + '.csv')
+
+
+def _caminho_colunar(diretorio_cache, sha):
+    # Versão convertida (Feather) do objeto com o mesmo hash
+    return os.path.join(diretorio_cache, 'objetos', sha + '.feather')
+
+
+def _ler_manifesto(diretorio_cache):
+    try:
+        with open(_caminho_manifesto(diretorio_cache), encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _gravar_manifesto(diretorio_cache, manifesto):
+    # Escrita atômica para não corromper o manifesto se o processo cair no meio
+    os.makedirs(diretorio_cache, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=diretorio_cache, suffix='.json')
+    with os.fdopen(fd, 'w', encoding='utf-8') as arquivo:
+        json.dump(manifesto, arquivo, indent=2)
+    os.replace(temporario, _caminho_manifesto(diretorio_cache))
+
+
+def _objeto_valido(diretorio_cache, entrada):
+    # Confere tamanho (barato) e hash (só uma vez por processo, enquanto o arquivo não mudar)
+    caminho = _caminho_objeto(diretorio_cache, entrada['sha256'])
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return False
+    if info.st_size != entrada['tamanho']:
+        return False
+    chave = (caminho, info.st_size, info.st_mtime_ns)
+    if chave in _verificados:
+        return True
+    if calcular_hash(caminho) != entrada['sha256']:
+        return False
+    _verificados.add(chave)
+    return True
+
+
+def _baixar(url, diretorio_cache):
+    import gdown
+
+    os.makedirs(os.path.join(diretorio_cache, 'objetos'), exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=os.path.join(diretorio_cache, 'objetos'), suffix='.download')
+    os.close(fd)
+    try:
+        if gdown.download(url, temporario, quiet=True) is None:
+            raise OSError(f"Falha ao baixar {url}")
+        sha = calcular_hash(temporario)
+        destino = _caminho_objeto(diretorio_cache, sha)
+        if os.path.exists(destino):
+            os.remove(temporario)  # conteúdo não mudou, reaproveita o objeto existente
+        else:
+            os.replace(temporario, destino)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    return {'sha256': sha, 'tamanho': os.path.getsize(destino), 'verificado_em': time.time()}
+
+
+def _resolver_remoto(url, diretorio_cache, intervalo_verificacao, offline):
+    manifesto = _ler_manifesto(diretorio_cache)
+    entrada = manifesto.get(url)
+
+    if entrada and _objeto_valido(diretorio_cache, entrada):
+        expirado = time.time() - entrada['verificado_em'] > intervalo_verificacao
+        if offline or not expirado:
+            return _caminho_objeto(diretorio_cache, entrada['sha256']), entrada['sha256'], entrada.get('deltas', [])
+    elif offline:
+        raise FileNotFoundError(f"Modo offline e sem cópia válida de {url} em {diretorio_cache}")
+
+    try:
+        nova_entrada = _baixar(url, diretorio_cache)
+    except Exception as erro:
+        if entrada and _objeto_valido(diretorio_cache, entrada):
+            # Sem rede: segue com a última cópia válida
+            warnings.warn(f"Não foi possível verificar {url} ({erro}); usando a cópia em cache.")
+            return _caminho_objeto(diretorio_cache, entrada['sha256']), entrada['sha256'], entrada.get('deltas', [])
+        raise
+
+    manifesto[url] = _manter_deltas(entrada, nova_entrada)
+    _gravar_manifesto(diretorio_cache, manifesto)
+    return _caminho_objeto(diretorio_cache, nova_entrada['sha256']), nova_entrada['sha256'], nova_entrada['deltas']
+
+
+def _resolver_local(caminho, diretorio_cache):
+    # Para arquivos locais só recalcula o hash quando tamanho ou data de modificação mudam
+    caminho = os.path.abspath(caminho)
+    info = os.stat(caminho)
+    manifesto = _ler_manifesto(diretorio_cache)
+    entrada = manifesto.get(caminho)
+
+    if entrada and entrada['tamanho'] == info.st_size and entrada['mtime_ns'] == info.st_mtime_ns:
+        return caminho, entrada['sha256'], entrada.get('deltas', [])
+
+    sha = calcular_hash(caminho)
+    nova_entrada = {'sha256': sha, 'tamanho': info.st_size, 'mtime_ns': info.st_mtime_ns}
+    manifesto[caminho] = _manter_deltas(entrada, nova_entrada)
+    _gravar_manifesto(diretorio_cache, manifesto)
+    return caminho, sha, nova_entrada['deltas']
+
+
+def _manter_deltas(entrada, nova_entrada):
+    # Os lotes anexados continuam valendo enquanto o arquivo base for o mesmo;
+    # um arquivo base novo (já com os pedidos) recomeça a lista
+    mesma_base = entrada and entrada['sha256'] == nova_entrada['sha256']
+    nova_entrada['deltas'] = entrada.get('deltas', []) if mesma_base else []
+    return nova_entrada
+
+
+def _chave_origem(origem):
+    # Chave da origem no manifesto: caminho absoluto para arquivos locais, a URL para os remotos
+    return os.path.abspath(origem) if os.path.exists(origem) else origem
+
+
+def _versoes(sha, deltas):
+    # Chave de cada versão: a base e, depois, a base acrescida de cada lote, na ordem
+    chaves = [sha]
+    for delta in deltas:
+        chaves.append(hashlib.sha256((chaves[-1] + delta['sha256']).encode()).hexdigest())
+    return chaves
+
+
+def ler_csv(caminho):
+    return aplicar_esquema(pd.read_csv(caminho))
+
+
+def _ler_dados(caminho, sha, diretorio_cache):
+    # Preferência: arquivo colunar (memory-mapped). O CSV só é lido quando não há conversão,
+    # e nesse caso a conversão é feita uma única vez para as próximas cargas.
+    # Em todos os casos o resultado sai ordenado por data (os arquivos convertidos já são gravados assim)
+    if formato_do_arquivo(caminho):
+        return ordenar_por_tempo(ler_colunar(caminho))
+
+    colunar = _caminho_colunar(diretorio_cache, sha)
+    if os.path.exists(colunar):
+        return ordenar_por_tempo(ler_colunar(colunar))
+
+    df = ordenar_por_tempo(ler_csv(caminho))
+    try:
+        gravar_colunar(df, colunar)
+    except (ImportError, OSError) as erro:
+        warnings.warn(f"Não foi possível converter {caminho} para Feather ({erro}); seguindo com o CSV.")
+    return df
+
+
+def _carregar_em_blocos(origem, caminho, sha, deltas, versoes, diretorio_cache):
+    # Modo em blocos: base e lotes são lidos em partes de tamanho limitado e só os agregados
+    # ficam em memória. A base não é convertida para Feather (a conversão leria tudo de uma vez),
+    # mas a cópia em Feather é usada quando já existe.
+    chave = 'blocos:' + versoes[-1]
+    if chave not in _datasets:
+        colunar = _caminho_colunar(diretorio_cache, sha)
+        caminhos = [colunar if os.path.exists(colunar) else caminho]
+        caminhos += [_caminho_colunar(diretorio_cache, delta['sha256']) for delta in deltas]
+        dataset = agregar_em_blocos(caminhos, versao=versoes[-1][:16] + '-blocos', origem=origem)
+
+        for antigo in [k for k, d in _datasets.items() if d.origem == origem]:
+            del _datasets[antigo]
+        _datasets[chave] = dataset
+    return _datasets[chave]
+
+
+def _arquivo_colunar(caminho, sha, diretorio_cache):
+    # Arquivo colunar com as linhas da base: ela mesma, ou a conversão em cache (se já existir)
+    if formato_do_arquivo(caminho):
+        return caminho
+    colunar = _caminho_colunar(diretorio_cache, sha)
+    return colunar if os.path.exists(colunar) else None
+
+
+def carregar_dataset(origem=None, diretorio_cache=None, intervalo_verificacao=None, offline=None, em_blocos=None):
+    # Origem pode ser a URL do Google Drive (padrão) ou um caminho de arquivo local
+    origem = origem or os.environ.get('PAINEL_DADOS', URL_DADOS)
+    diretorio_cache = diretorio_cache or DIRETORIO_CACHE
+    if intervalo_verificacao is None:
+        intervalo_verificacao = INTERVALO_VERIFICACAO
+    if offline is None:
+        offline = os.environ.get('PAINEL_OFFLINE', '') not in ('', '0')
+    if em_blocos is None:
+        em_blocos = EM_BLOCOS
+
+    with _lock:
+        if os.path.exists(origem):
+            caminho, sha, deltas = _resolver_local(origem, diretorio_cache)
+        else:
+            caminho, sha, deltas = _resolver_remoto(origem, diretorio_cache, intervalo_verificacao, offline)
+
+        # Mesmo conteúdo (base + lotes anexados) -> mesmo DataFrame, compartilhado por todo o processo.
+        # Como o manifesto é relido a cada chamada, um lote anexado por outro processo aparece
+        # no próximo rerun do dashboard, sem reiniciar.
+        versoes = _versoes(sha, deltas)
+        if em_blocos:
+            return _carregar_em_blocos(origem, caminho, sha, deltas, versoes, diretorio_cache)
+        if versoes[-1] not in _datasets:
+            # Parte da versão mais recente já em memória e anexa só os lotes que faltam
+            carregadas = [i for i, chave in enumerate(versoes) if chave in _datasets]
+            if carregadas:
+                n = carregadas[-1]
+                dataset = _datasets[versoes[n]]
+            else:
+                n = 0
+                df = _ler_dados(caminho, sha, diretorio_cache)
+                colunar = _arquivo_colunar(caminho, sha, diretorio_cache)
+                dataset = Dataset(df, versao=sha[:16], origem=origem, arquivos=[colunar] if colunar else None)
+            for i, delta in enumerate(deltas[n:], start=n + 1):
+                arquivo = _caminho_colunar(diretorio_cache, delta['sha256'])
+                dataset = dataset.anexar(ler_colunar(arquivo), versao=versoes[i][:16], arquivo=arquivo)
+
+            # Versões antigas da mesma origem deixam de ser servidas
+            for antigo in [k for k, d in _datasets.items() if d.origem == origem]:
+                del _datasets[antigo]
+            _datasets[versoes[-1]] = dataset
+        return _datasets[versoes[-1]]
+
+
+def ler_delta(caminho):
+    if formato_do_arquivo(caminho):
+        return ler_colunar(caminho)
+    return pd.read_csv(caminho)
+
+
+def anexar_delta(caminho, origem=None, diretorio_cache=None):
+    # Ingere um arquivo de itens de pedido novos (CSV, Feather ou Parquet): valida contra o
+    # dataset atual, grava o lote convertido no cache e registra no manifesto da origem.
+    # Retorna a nova versão do dataset, montada a partir da atual sem reler a base.
+    origem = origem or os.environ.get('PAINEL_DADOS', URL_DADOS)
+    diretorio_cache = diretorio_cache or DIRETORIO_CACHE
+
+    atual = carregar_dataset(origem, diretorio_cache)
+    # No modo em blocos não há linhas em memória: valida contra as colunas e tipos da base
+    referencia = atual.df if atual.df is not None else atual.esquema
+    lote = validar_delta(ler_delta(caminho), referencia)
+    sha = calcular_hash(caminho)
+
+    with _lock:
+        manifesto = _ler_manifesto(diretorio_cache)
+        entrada = manifesto[_chave_origem(origem)]
+        deltas = entrada.setdefault('deltas', [])
+        if any(delta['sha256'] == sha for delta in deltas):
+            warnings.warn(f"{caminho} já foi anexado a {origem}; nada a fazer.")
+        else:
+            gravar_colunar(lote, _caminho_colunar(diretorio_cache, sha))
+            deltas.append({'sha256': sha, 'linhas': len(lote), 'anexado_em': time.time()})
+            _gravar_manifesto(diretorio_cache, manifesto)
+
+    return carregar_dataset(origem, diretorio_cache)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Anexa arquivos de itens de pedido novos ao dataset do painel.')
+    parser.add_argument('deltas', nargs='+', help='arquivos com as linhas novas (.csv, .feather ou .parquet)')
+    parser.add_argument('--origem', help='origem do dataset (padrão: PAINEL_DADOS ou a URL do Google Drive)')
+    args = parser.parse_args()
+
+    for caminho in args.deltas:
+        print(anexar_delta(caminho, origem=args.origem))
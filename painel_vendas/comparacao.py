@@ -0,0 +1,62 @@
+from collections import namedtuple
+
+import pandas as pd
+
+# Período de comparação: intervalo inclusivo de meses (pd.Period com frequência mensal)
+Periodo = namedtuple('Periodo', ['rotulo', 'inicio', 'fim'])
+
+MESES_POR_TIPO = {'mes': 1, 'trimestre': 3, 'semestre': 6, 'ano': 12}
+
+
+def periodo(tipo, ano, numero=1, rotulo=None):
+    # periodo('semestre', 2017, 1) -> jan/2017 a jun/2017; periodo('ano', 2018) -> 2018 inteiro
+    if tipo not in MESES_POR_TIPO:
+        raise ValueError(f"Tipo de período desconhecido: {tipo} (use um de {list(MESES_POR_TIPO)})")
+    meses = MESES_POR_TIPO[tipo]
+    if not 1 <= numero <= 12 // meses:
+        raise ValueError(f"Número de {tipo} inválido: {numero}")
+    inicio = pd.Period(year=ano, month=(numero - 1) * meses + 1, freq='M')
+    fim = inicio + (meses - 1)
+    if rotulo is None:
+        rotulo = {'mes': str(inicio), 'ano': str(ano)}.get(tipo, f"{numero}º {tipo} {ano}")
+    return Periodo(rotulo, inicio, fim)
+
+
+def periodo_anterior(periodo_base, rotulo=None):
+    # Mesmo intervalo um ano antes (comparação ano contra ano)
+    inicio, fim = periodo_base.inicio - 12, periodo_base.fim - 12
+    return Periodo(rotulo or f"{periodo_base.rotulo} (ano anterior)", inicio, fim)
+
+
+def comparar_periodos(dados, meses, periodo_a, periodo_b, dimensao='product_category_name', top_n=10):
+    # Totais de total_price por 'dimensao' nos dois períodos, lado a lado.
+    # 'dados' são células agregadas (Cubo.dados) e 'meses' a tabela de meses do cubo.
+    # Um agrupamento por período (máscara dos meses + soma por dimensão) substitui o filtro por
+    # categoria em laço; como cada período tem a sua máscara, períodos sobrepostos (ano x
+    # semestre do mesmo ano) contam as mesmas células nos dois.
+    ordinal = {rotulo: pd.Period(inicio, freq='M').ordinal for rotulo, inicio in meses['inicio'].items()}
+    mes = dados['order_purchase_year_month'].astype(object).map(ordinal)
+    totais = {}
+    for p in (periodo_a, periodo_b):
+        no_periodo = (mes >= p.inicio.ordinal) & (mes <= p.fim.ordinal)
+        totais[p.rotulo] = dados.loc[no_periodo, [dimensao, 'total_price']].groupby(dimensao, observed=True)['total_price'].sum()
+    tabela = pd.concat(totais, axis=1)
+    return selecionar_top(tabela, periodo_a, periodo_b, dimensao, top_n)
+
+
+def selecionar_top(tabela, periodo_a, periodo_b, dimensao, top_n):
+    # 'tabela': total por valor da dimensão (índice) com uma coluna por rótulo de período.
+    # União dos top N de cada período, ordenada pelo desempenho do segundo período.
+    # Cada período só classifica os valores com vendas nele: em um período curto, com menos de
+    # N valores vendendo, os demais não ocupam vagas do top
+    tabela = tabela.reindex(columns=[periodo_a.rotulo, periodo_b.rotulo])
+    no_top = pd.Series(False, index=tabela.index)
+    for rotulo in (periodo_a.rotulo, periodo_b.rotulo):
+        vendas = tabela[rotulo].dropna()
+        no_top[vendas[vendas > 0].nlargest(top_n).index] = True
+    # 0 sem vendas no período, só para exibir
+    resultado = tabela[no_top].fillna(0).sort_values(by=periodo_b.rotulo, ascending=False)
+    resultado.columns.name = None
+    resultado = resultado.reset_index()
+    resultado[dimensao] = resultado[dimensao].astype(str)
+    return resultado
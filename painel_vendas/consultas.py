@@ -0,0 +1,118 @@
+import os
+from functools import cached_property
+
+from painel_vendas.cache_resultados import cache
+from painel_vendas.comparacao import comparar_periodos
+from painel_vendas.cubo import obter_cubo
+from painel_vendas.filtros import filtrar
+from painel_vendas.instrumentacao import registrar_quadro, secao
+from painel_vendas.metricas import calcular_metricas
+from painel_vendas.tabela import contar_linhas, ordenar_linhas
+
+# Motor das métricas, comparações e insights:
+#  - 'pandas': cubo pré-agregado e estruturas em memória (padrão)
+#  - 'duckdb': SQL sobre os arquivos colunares do dataset, sem trazer as linhas para o pandas
+MOTOR = os.environ.get('PAINEL_MOTOR', 'pandas')
+
+MOTORES = ('pandas', 'duckdb')
+
+
+class Consulta:
+    # Tudo o que as abas do dashboard perguntam para um estado de filtros.
+    # As métricas saem do cubo e das estruturas de distintos; as linhas filtradas são um slice
+    # ou um array de posições sobre o dataset compartilhado, e só as colunas que um cálculo
+    # usa são materializadas (quadro).
+    # Cada resultado fica no cache de resultados do processo, chaveado por
+    # (pergunta, motor, versão do dataset, filtros normalizados, argumentos).
+    # Outros motores sobrescrevem os métodos _calcular_*, retornando os mesmos DataFrames.
+    motor = 'pandas'
+
+    def __init__(self, dataset, filtros):
+        self.dataset = dataset
+        self.filtros = filtros
+
+    @cached_property
+    def cubo(self):
+        return obter_cubo(self.dataset)
+
+    def _memorizado(self, nome, calcular, *argumentos):
+        chave = (nome, self.motor, self.dataset.versao, self.filtros) + argumentos
+        return cache.obter(chave, lambda: calcular(*argumentos))
+
+    @cached_property
+    def _linhas(self):
+        with secao('filtrar') as trecho:
+            linhas = self._memorizado('filtrar', lambda: filtrar(self.dataset, self.filtros))
+            trecho.linhas = contar_linhas(linhas['clientes'])
+        return linhas
+
+    def quadro(self, visao, colunas):
+        # Linhas filtradas da visão só com as colunas pedidas. Quando só a data filtra (slice)
+        # é uma visão do dataset, sem cópia; com posições, copia apenas essas colunas
+        df = self.dataset.df
+        quadro = df.iloc[self._linhas[visao], df.columns.get_indexer(colunas)]
+        registrar_quadro(visao, quadro)
+        return quadro
+
+    def linhas(self, visao, ordenar_por=None, crescente=True):
+        # Posições (ou slice) das linhas filtradas da visão; com 'ordenar_por', na ordem da coluna
+        if ordenar_por is None:
+            return self._linhas[visao]
+        with secao('ordenar', linhas=contar_linhas(self._linhas[visao])):
+            return self._memorizado(
+                'ordem',
+                lambda v, c, a: ordenar_linhas(self.dataset.df, self._linhas[v], c, a),
+                visao, ordenar_por, crescente
+            )
+
+    def selecao(self, visao):
+        # Células do cubo e linhas de meses parciais da visão ('clientes' ou 'vendedores')
+        with secao(f'selecao:{visao}') as trecho:
+            celulas, linhas = self._memorizado('selecao', lambda v: self.cubo.selecionar(self.filtros, v), visao)
+            trecho.linhas = len(linhas)  # linhas dos meses parciais; o resto vem das células
+        return celulas, linhas
+
+    def comparacao(self, periodo_a, periodo_b, dimensao='product_category_name', top_n=10):
+        # Totais lado a lado de dois períodos por dimensão, a partir das células selecionadas do cubo
+        with secao('comparacao'):
+            return self._memorizado('comparacao', self._calcular_comparacao, periodo_a, periodo_b, dimensao, top_n)
+
+    def _calcular_comparacao(self, periodo_a, periodo_b, dimensao, top_n):
+        visao = 'vendedores' if dimensao == 'seller_state' else 'clientes'
+        return comparar_periodos(
+            self.cubo.dados(self.selecao(visao)), self.cubo.meses, periodo_a, periodo_b, dimensao=dimensao, top_n=top_n
+        )
+
+    def pedidos_por_fotos(self):
+        # Pedidos únicos por quantidade de fotos do produto (aba de insights)
+        with secao('pedidos_por_fotos'):
+            return self._memorizado('pedidos_por_fotos', self._calcular_pedidos_por_fotos)
+
+    def _calcular_pedidos_por_fotos(self):
+        clientes = self.quadro('clientes', ['product_photos_qty', 'order_id'])
+        df_photos = clientes.groupby('product_photos_qty')['order_id'].nunique().reset_index()
+        return df_photos.rename(columns={'order_id': 'quantidade_pedidos'})
+
+    @cached_property
+    def metricas(self):
+        # Contexto de métricas do rerun: calculado uma vez e lido por todas as funções de exibição
+        with secao('metricas'):
+            metricas = self._memorizado('metricas', self._calcular_metricas)
+            registrar_quadro('metricas', metricas)
+            return metricas
+
+    def _calcular_metricas(self):
+        return calcular_metricas(self.dataset, self.selecao('clientes'), self.selecao('vendedores'))
+
+
+def criar_consulta(dataset, filtros, motor=None):
+    # Consulta do motor escolhido. O motor SQL precisa dos arquivos colunares do dataset;
+    # sem eles (CSV ainda não convertido, modo em blocos) a consulta fica com o pandas.
+    motor = motor or MOTOR
+    if motor not in MOTORES:
+        raise ValueError(f"Motor desconhecido: {motor} (use um de {MOTORES})")
+    if motor == 'duckdb' and dataset.arquivos:
+        from painel_vendas.motor_sql import ConsultaSQL
+
+        return ConsultaSQL(dataset, filtros)
+    return Consulta(dataset, filtros)
@@ -0,0 +1,208 @@
+import copy
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from painel_vendas.filtros import COLUNA_ESTADO, filtrar_linhas
+from painel_vendas.indice_tempo import IndiceTempo
+from painel_vendas.particionado import Particoes, escrever_coluna, ler_coluna, particionar
+
+# Dimensões do cubo, na ordem das chaves
+DIMENSOES = ['order_purchase_year_month', 'customer_state', 'seller_state', 'product_category_name', 'order_status']
+
+# Medidas aditivas guardadas em cada célula
+MEDIDAS = ['total_price', 'qtd_itens']
+
+
+def _agregar_linhas(df, por):
+    # Mesmas medidas do cubo, calculadas direto sobre as linhas
+    return _medidas(df.groupby(por, observed=True, dropna=False))
+
+
+def _medidas(agrupado):
+    return agrupado.agg(total_price=('total_price', 'sum'), qtd_itens=('total_price', 'size')).reset_index()
+
+
+def _meses(df):
+    # Início e fim (calendário) de cada ano-mês, para saber se o filtro de datas cobre o mês inteiro
+    periodos = (
+        df.groupby('order_purchase_year_month', observed=True)['order_purchase_timestamp']
+        .min().dt.to_period('M')
+    )
+    return pd.DataFrame({
+        'inicio': periodos.dt.start_time.dt.date,
+        'fim': periodos.dt.end_time.dt.date,
+    })
+
+
+def _agregar_particao(diretorio, inicio, fim, bases):
+    # Roda em um processo do pool: células de uma partição de linhas, identificadas pela
+    # combinação dos códigos das dimensões (sem valor -> último código da base, como o
+    # groupby com dropna=False, que deixa o grupo sem valor por último)
+    chave = np.zeros(fim - inicio, dtype=np.int64)
+    for dimensao, base in zip(DIMENSOES, bases):
+        codigos = ler_coluna(diretorio, dimensao, inicio, fim).astype(np.int64)
+        chave = chave * base + np.where(codigos < 0, base - 1, codigos)
+    chaves, celula = np.unique(chave, return_inverse=True)
+
+    escrever_coluna(diretorio, 'celula_local', inicio, celula)
+    soma = np.bincount(celula, weights=ler_coluna(diretorio, 'total_price', inicio, fim))
+    return chaves, soma, np.bincount(celula)
+
+
+def _agregar_particionado(df, fronteiras):
+    # Mesmas células e celula_da_linha do groupby, calculadas por partição nos processos do pool
+    # e combinadas aqui: as chaves parciais são unidas (somando células repetidas entre partições)
+    bases = [len(df[dimensao].cat.categories) + 1 for dimensao in DIMENSOES]
+    colunas = {dimensao: df[dimensao].cat.codes.to_numpy() for dimensao in DIMENSOES}
+    colunas['total_price'] = df['total_price'].to_numpy(dtype=np.float64)
+    with Particoes(colunas, fronteiras, saidas={'celula_local': (len(df), np.int64)}) as particoes:
+        parciais = particoes.mapear(_agregar_particao, bases)
+        celula_local = particoes.ler('celula_local')
+
+    chaves, celula_global = np.unique(np.concatenate([p[0] for p in parciais]), return_inverse=True)
+    soma = np.bincount(celula_global, weights=np.concatenate([p[1] for p in parciais]))
+    quantidade = np.bincount(celula_global, weights=np.concatenate([p[2] for p in parciais]))
+
+    celula_da_linha = np.empty(len(df), dtype=np.int64)
+    deslocamento = 0
+    for (inicio, fim), (chaves_particao, _, _) in zip(fronteiras, parciais):
+        mapa = celula_global[deslocamento:deslocamento + len(chaves_particao)]
+        celula_da_linha[inicio:fim] = mapa[celula_local[inicio:fim]]
+        deslocamento += len(chaves_particao)
+
+    celulas = {}
+    for dimensao, base in reversed(list(zip(DIMENSOES, bases))):
+        codigos = chaves % base
+        chaves = chaves // base
+        celulas[dimensao] = pd.Categorical.from_codes(
+            np.where(codigos == base - 1, -1, codigos), dtype=df[dimensao].dtype
+        )
+    celulas = pd.DataFrame({dimensao: celulas[dimensao] for dimensao in DIMENSOES})
+    celulas['total_price'] = soma
+    celulas['qtd_itens'] = quantidade.astype(np.int64)
+    return celulas, celula_da_linha
+
+
+class Cubo:
+    # Cubo pré-agregado por (ano-mês, estado do cliente, estado do vendedor, categoria, status).
+    # As visões respondem fatiando e consolidando as células; só os meses cortados pelo
+    # filtro de datas (no máximo dois, nas pontas do intervalo) são calculados sobre as linhas.
+
+    def __init__(self, df):
+        self.df = df
+        fronteiras = particionar(df)
+        if fronteiras is not None:
+            # Base grande com PAINEL_PROCESSOS: agregação por partições de meses em paralelo
+            self.celulas, self.celula_da_linha = _agregar_particionado(df, fronteiras)
+        else:
+            agrupado = df.groupby(DIMENSOES, observed=True, dropna=False)
+            self.celulas = _medidas(agrupado)
+            # Célula de cada linha (mesma ordem de self.celulas), usada pelas estruturas por célula
+            self.celula_da_linha = agrupado.ngroup().to_numpy()
+
+        self.meses = _meses(df)
+        self.tempo = IndiceTempo(df)
+
+    def anexar(self, dataset, inicio):
+        # Cubo da nova versão do dataset somando só as linhas a partir de 'inicio'.
+        # As células existentes mantêm a posição (as estruturas por célula continuam válidas);
+        # só as células dos meses presentes nas linhas novas são consultadas, e combinações
+        # inéditas entram no fim.
+        df = dataset.df
+        novas = df.iloc[inicio:]
+        celulas = self.celulas.assign(**{
+            coluna: self.celulas[coluna].cat.set_categories(df[coluna].cat.categories) for coluna in DIMENSOES
+        })
+
+        agrupado = novas.groupby(DIMENSOES, observed=True, dropna=False)
+        delta = _medidas(agrupado)
+        tocadas = celulas[celulas['order_purchase_year_month'].isin(delta['order_purchase_year_month'].unique())]
+        destino = delta[DIMENSOES].merge(
+            tocadas[DIMENSOES].reset_index(names='celula'), on=DIMENSOES, how='left'
+        )['celula'].to_numpy(dtype=np.float64, copy=True)
+
+        existentes = ~np.isnan(destino)
+        for medida in MEDIDAS:
+            valores = celulas[medida].to_numpy(copy=True)
+            valores[destino[existentes].astype(np.int64)] += delta[medida].to_numpy()[existentes]
+            celulas[medida] = valores
+        destino[~existentes] = len(celulas) + np.arange(int((~existentes).sum()))
+        celulas = pd.concat([celulas, delta[~existentes]], ignore_index=True)
+
+        novo = copy.copy(self)
+        novo.df = df
+        novo.celulas = celulas
+        novo.celula_da_linha = np.concatenate([
+            self.celula_da_linha[:inicio], destino.astype(np.int64)[agrupado.ngroup().to_numpy()]
+        ])
+        meses = _meses(novas)
+        novo.meses = pd.concat([self.meses, meses[~meses.index.isin(self.meses.index)]])
+        novo.tempo = self.tempo.anexar(dataset, inicio)
+        return novo
+
+    def _meses_do_intervalo(self, data_inicio, data_fim):
+        no_intervalo = (self.meses['fim'] >= data_inicio) & (self.meses['inicio'] <= data_fim)
+        inteiros = no_intervalo & (self.meses['inicio'] >= data_inicio) & (self.meses['fim'] <= data_fim)
+        return list(self.meses.index[inteiros]), list(self.meses.index[no_intervalo & ~inteiros])
+
+    def _fatia(self, filtros, visao, meses):
+        celulas = self.celulas
+        mascara = celulas['order_purchase_year_month'].isin(meses)
+        if filtros.status is not None:
+            mascara &= celulas['order_status'].isin(filtros.status)
+        if filtros.estados is not None:
+            mascara &= celulas[COLUNA_ESTADO[visao]].isin(filtros.estados)
+        if filtros.categorias is not None:
+            mascara &= celulas['product_category_name'].isin(filtros.categorias)
+        return celulas[mascara]
+
+    def selecionar(self, filtros, visao):
+        # Células do cubo (meses inteiros) e posições das linhas (meses parciais) que atendem aos filtros
+        inteiros, parciais = self._meses_do_intervalo(filtros.data_inicio, filtros.data_fim)
+        celulas = self._fatia(filtros, visao, inteiros).index.to_numpy()
+
+        linhas = np.array([], dtype=np.int64)
+        if parciais:
+            # Com o dataset ordenado por data, as linhas de cada mês parcial dentro do
+            # intervalo são um bloco contíguo encontrado por busca binária
+            fatia = self.tempo.fatia(filtros.data_inicio, filtros.data_fim)
+            blocos = []
+            for mes in parciais:
+                inicio = max(self.tempo.posicao(self.meses.at[mes, 'inicio']), fatia.start)
+                fim = min(self.tempo.posicao(self.meses.at[mes, 'fim'] + datetime.timedelta(days=1)), fatia.stop)
+                blocos.append(np.arange(inicio, max(inicio, fim)))
+            candidatas = np.concatenate(blocos)
+            mascara = filtrar_linhas(self.df.iloc[candidatas], filtros, visao).to_numpy()
+            linhas = candidatas[mascara]
+        return celulas, linhas
+
+    def dados(self, selecao):
+        # Células selecionadas + meses parciais agregados no mesmo formato, prontos para consolidar
+        celulas, linhas = selecao
+        dados = self.celulas.iloc[celulas]
+        if len(linhas):
+            dados = pd.concat([dados, _agregar_linhas(self.df.iloc[linhas], DIMENSOES)], ignore_index=True)
+        return dados
+
+    def agregar(self, filtros, visao, por=None):
+        return consolidar(self.dados(self.selecionar(filtros, visao)), por)
+
+
+def consolidar(dados, por=None):
+    # Soma de total_price e número de itens por 'por' (dimensão ou lista de dimensões).
+    # Sem 'por', retorna uma Series com os totais.
+    if por is None:
+        return dados[MEDIDAS].sum()
+
+    por = [por] if isinstance(por, str) else list(por)
+    resultado = dados.groupby(por, observed=True)[MEDIDAS].sum().reset_index()
+    for coluna in por:
+        # Rótulos como texto simples: os gráficos não devem herdar as categorias sem dados
+        resultado[coluna] = resultado[coluna].astype(str)
+    return resultado
+
+
+def obter_cubo(dataset):
+    return dataset.derivado('cubo', Cubo)
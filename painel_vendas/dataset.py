@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pandas as pd
+
+from painel_vendas.formato_colunar import concatenar
+from painel_vendas.indice_tempo import COLUNA_TEMPO, ordenar_por_tempo
+
+# O DataFrame compartilhado é protegido pelo Copy-on-Write, que é o padrão a partir do pandas 3
+# e precisa ser ligado nas versões anteriores
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+class Dataset:
+    # Dataset carregado uma única vez por processo e compartilhado entre as sessões do Streamlit.
+    # 'versao' identifica o conteúdo (hash do arquivo de origem) e serve de chave para os caches.
+    # 'arquivos' são os arquivos colunares com exatamente as mesmas linhas (base + lotes),
+    # quando existem; o motor SQL consulta direto neles.
+
+    def __init__(self, df, versao, origem=None, arquivos=None):
+        self._df = df
+        self.versao = versao
+        self.origem = origem
+        self.arquivos = arquivos
+        self.carregado_em = time.time()
+        self._derivados = {}
+        self._lock = threading.RLock()
+
+    @property
+    def df(self):
+        # Somente leitura: cada acesso recebe uma cópia rasa, que divide os dados com o DataFrame
+        # compartilhado. Atribuir ou alterar colunas (inclusive inplace=True) copia só o que
+        # mudou e fica na cópia da sessão; o original, as outras sessões e as estruturas
+        # derivadas não enxergam a alteração. Os arrays (to_numpy) já vêm somente leitura.
+        return None if self._df is None else self._df.copy(deep=False)
+
+    def derivado(self, nome, construtor):
+        # Estruturas derivadas (cubo, índices...) são construídas uma vez por versão do dataset
+        if nome not in self._derivados:
+            with self._lock:
+                if nome not in self._derivados:
+                    self._derivados[nome] = construtor(self.df)
+        return self._derivados[nome]
+
+    def anexar(self, delta, versao, arquivo=None):
+        # Nova versão com as linhas de 'delta' (já validadas e ordenadas) no fim.
+        # No caso normal (pedidos novos, todos posteriores aos existentes) as posições antigas
+        # não mudam e cada estrutura derivada que sabe se atualizar (método 'anexar') recebe só
+        # as linhas novas; as demais são reconstruídas sob demanda. Se o lote tiver datas
+        # anteriores ao fim do dataset, ele é reordenado e tudo é reconstruído sob demanda.
+        inicio = len(self._df)
+        df = concatenar(self._df, delta)
+        arquivos = self.arquivos + [arquivo] if self.arquivos and arquivo else None
+        if inicio and delta[COLUNA_TEMPO].iloc[0] < self._df[COLUNA_TEMPO].iloc[-1]:
+            return Dataset(ordenar_por_tempo(df), versao, self.origem, arquivos)
+
+        novo = Dataset(df, versao, self.origem, arquivos)
+        with self._lock:
+            derivados = list(self._derivados.items())
+        # Na ordem de construção: o cubo vem antes das estruturas que dependem dele
+        for nome, estrutura in derivados:
+            if hasattr(estrutura, 'anexar'):
+                novo._derivados[nome] = estrutura.anexar(novo, inicio)
+        return novo
+
+    def __len__(self):
+        return len(self._df)
+
+    def __repr__(self):
+        return f"Dataset(versao={self.versao!r}, linhas={len(self)}, origem={self.origem!r})"
@@ -0,0 +1,253 @@
+import copy
+import os
+
+import numpy as np
+import pandas as pd
+
+from painel_vendas.cubo import obter_cubo
+from painel_vendas.particionado import Particoes, ler_coluna, particionar
+
+# 'exato' (conjuntos de ids codificados por célula) ou 'hll' (HyperLogLog esparso por célula)
+MODO = os.environ.get('PAINEL_DISTINTOS', 'exato')
+
+# Erro relativo padrão desejado no modo 'hll' (define a quantidade de registradores)
+ERRO_HLL = float(os.environ.get('PAINEL_DISTINTOS_ERRO', 0.01))
+
+# Tamanho máximo (grupos x ids) do bitset usado na união exata; acima disso usa np.unique
+LIMITE_BITSET = 64 * 1024 * 1024
+
+
+def _precisao_hll(erro):
+    # Erro padrão do HLL ~ 1.04 / sqrt(m), com m = 2 ** p registradores
+    p = int(np.ceil(np.log2((1.04 / erro) ** 2)))
+    return min(max(p, 4), 16)
+
+
+def _registradores_hll(codigos_hash, p):
+    # Índice do registrador (p bits mais altos) e posição do primeiro bit 1 no restante
+    registrador = (codigos_hash >> np.uint64(64 - p)).astype(np.uint16)
+    resto = codigos_hash << np.uint64(p)
+    posicao = np.full(len(codigos_hash), 64 - p + 1, dtype=np.uint8)
+    for bit in range(64 - p):
+        marcado = (posicao == 64 - p + 1) & ((resto >> np.uint64(63 - bit)) & np.uint64(1)).astype(bool)
+        posicao[marcado] = bit + 1
+    return registrador, posicao
+
+
+def _estimar_hll(registros, m):
+    # Estimativa padrão do HyperLogLog, com correção por contagem linear para cardinalidades baixas
+    alfa = 0.7213 / (1 + 1.079 / m)
+    estimativa = alfa * m * m / np.sum(np.power(2.0, -registros.astype(np.float64)), axis=-1)
+    vazios = np.sum(registros == 0, axis=-1)
+    linear = m * np.log(m / np.maximum(vazios, 1))
+    return np.where((estimativa <= 2.5 * m) & (vazios > 0), linear, estimativa)
+
+
+def _maiores_por_chave(chaves, posicoes):
+    # Chaves únicas (ordenadas), cada uma com a maior posição encontrada
+    ordem = np.lexsort((-posicoes.astype(np.int16), chaves))
+    chaves, posicoes = chaves[ordem], posicoes[ordem]
+    primeiro = np.r_[True, chaves[1:] != chaves[:-1]]
+    return chaves[primeiro], posicoes[primeiro]
+
+
+def _pares_particao(diretorio, inicio, fim, modo, base):
+    # Roda em um processo do pool: pares (célula, id) ou (célula, registrador) de uma partição
+    celulas = ler_coluna(diretorio, 'celula_da_linha', inicio, fim).astype(np.int64)
+    codigos = ler_coluna(diretorio, 'codigo_da_linha', inicio, fim)
+    if modo == 'exato':
+        return np.unique(celulas * base + codigos), None
+    registrador_do_id = ler_coluna(diretorio, 'registrador_do_id')
+    posicao_do_id = ler_coluna(diretorio, 'posicao_do_id')
+    return _maiores_por_chave(celulas * base + registrador_do_id[codigos], posicao_do_id[codigos])
+
+
+def _pares_particionados(colunas, fronteiras, modo, base):
+    # Junta os pares das partições. Com partições de meses inteiros as células não se repetem
+    # entre partições e os pares já saem ordenados; senão, são unidos de novo.
+    with Particoes(colunas, fronteiras) as particoes:
+        parciais = particoes.mapear(_pares_particao, modo, base)
+    chaves = np.concatenate([p[0] for p in parciais])
+    posicoes = None if modo == 'exato' else np.concatenate([p[1] for p in parciais])
+    if np.all(chaves[1:] > chaves[:-1]):
+        return chaves, posicoes
+    if modo == 'exato':
+        return np.unique(chaves), None
+    return _maiores_por_chave(chaves, posicoes)
+
+
+def _expandir(ptr, celulas):
+    # Posições (no array de pares) de todos os elementos das células selecionadas, sem laço em Python
+    inicio = ptr[celulas]
+    tamanhos = ptr[celulas + 1] - inicio
+    total = int(tamanhos.sum())
+    deslocamento = np.repeat(inicio - np.cumsum(tamanhos) + tamanhos, tamanhos)
+    return deslocamento + np.arange(total), np.repeat(np.arange(len(celulas)), tamanhos)
+
+
+class IndiceDistintos:
+    # Estrutura de contagem de distintos de uma coluna (customer_unique_id, seller_id)
+    # guardada por célula do cubo. Qualquer combinação de filtros conta distintos
+    # unindo as células selecionadas, sem reprocessar as linhas.
+
+    def __init__(self, valores, celula_da_linha, n_celulas, modo=MODO, erro=ERRO_HLL, fronteiras=None):
+        if modo not in ('exato', 'hll'):
+            raise ValueError(f"Modo de contagem de distintos desconhecido: {modo}")
+        self.modo = modo
+        self.coluna = valores.name
+
+        # Codificação por dicionário: cada id vira um inteiro
+        self.codigo_da_linha, uniques = pd.factorize(valores)
+        self.ids = pd.Index(uniques)
+        self.n_ids = len(uniques)
+
+        # Com 'fronteiras' (partições de linhas), os pares são montados nos processos do pool
+        colunas = {'celula_da_linha': celula_da_linha, 'codigo_da_linha': self.codigo_da_linha}
+        if modo == 'exato':
+            if fronteiras is not None:
+                chaves, _ = _pares_particionados(colunas, fronteiras, modo, self.n_ids)
+            else:
+                chaves = celula_da_linha.astype(np.int64) * self.n_ids + self.codigo_da_linha
+                chaves = np.unique(chaves)
+            celula_do_par = chaves // self.n_ids
+            self.valores = (chaves % self.n_ids).astype(np.int32)
+        else:
+            self.p = _precisao_hll(erro)
+            self.m = 1 << self.p
+            hashes = pd.util.hash_array(np.asarray(uniques, dtype=object))
+            self.registrador_do_id, self.posicao_do_id = _registradores_hll(hashes, self.p)
+            # HLL esparso: para cada (célula, registrador) guarda só a maior posição
+            if fronteiras is not None:
+                colunas.update(registrador_do_id=self.registrador_do_id, posicao_do_id=self.posicao_do_id)
+                chaves, self.posicoes = _pares_particionados(colunas, fronteiras, modo, self.m)
+            else:
+                chaves = celula_da_linha.astype(np.int64) * self.m + self.registrador_do_id[self.codigo_da_linha]
+                chaves, self.posicoes = _maiores_por_chave(chaves, self.posicao_do_id[self.codigo_da_linha])
+            celula_do_par = chaves // self.m
+            self.valores = (chaves % self.m).astype(np.uint16)
+
+        self.ptr = np.searchsorted(celula_do_par, np.arange(n_celulas + 1))
+
+    def anexar(self, dataset, inicio):
+        # Estrutura da nova versão do dataset com as linhas a partir de 'inicio'. Os pares
+        # (célula, id) ou (célula, registrador) novos são intercalados nos existentes, que já
+        # estão ordenados, sem refazer a ordenação nem reler as linhas antigas.
+        cubo = obter_cubo(dataset)
+        valores = dataset.df[self.coluna].iloc[inicio:]
+        novo = copy.copy(self)
+
+        codigos = self.ids.get_indexer(valores)
+        desconhecidos = codigos < 0
+        codigos_ineditos, ineditos = pd.factorize(valores[desconhecidos])
+        codigos[desconhecidos] = np.where(codigos_ineditos >= 0, self.n_ids + codigos_ineditos, -1)
+        novo.ids = self.ids.append(pd.Index(ineditos))
+        novo.n_ids = len(novo.ids)
+        novo.codigo_da_linha = np.concatenate([self.codigo_da_linha[:inicio], codigos])
+
+        celula_do_par = np.repeat(np.arange(len(self.ptr) - 1), np.diff(self.ptr))
+        celula_nova = cubo.celula_da_linha[inicio:].astype(np.int64)
+        if self.modo == 'exato':
+            base = novo.n_ids
+            novas = np.unique(celula_nova * base + codigos)
+        else:
+            base = self.m
+            hashes = pd.util.hash_array(np.asarray(ineditos, dtype=object))
+            registradores, posicoes = _registradores_hll(hashes, self.p)
+            novo.registrador_do_id = np.concatenate([self.registrador_do_id, registradores])
+            novo.posicao_do_id = np.concatenate([self.posicao_do_id, posicoes])
+            novas, posicoes_novas = _maiores_por_chave(
+                celula_nova * base + novo.registrador_do_id[codigos], novo.posicao_do_id[codigos]
+            )
+
+        chaves = celula_do_par * base + self.valores
+        onde = np.searchsorted(chaves, novas)
+        presentes = np.zeros(len(novas), dtype=bool)
+        validos = onde < len(chaves)
+        presentes[validos] = chaves[onde[validos]] == novas[validos]
+        if self.modo == 'hll':
+            posicoes = self.posicoes.copy()
+            posicoes[onde[presentes]] = np.maximum(posicoes[onde[presentes]], posicoes_novas[presentes])
+            novo.posicoes = np.insert(posicoes, onde[~presentes], posicoes_novas[~presentes])
+
+        chaves = np.insert(chaves, onde[~presentes], novas[~presentes])
+        novo.valores = (chaves % base).astype(self.valores.dtype)
+        novo.ptr = np.searchsorted(chaves // base, np.arange(len(cubo.celulas) + 1))
+        return novo
+
+    def _contar_grupos(self, grupos, valores, posicoes, n_grupos):
+        if self.modo == 'exato':
+            if n_grupos * self.n_ids <= LIMITE_BITSET:
+                marcado = np.zeros((n_grupos, self.n_ids), dtype=bool)
+                marcado[grupos, valores] = True
+                return np.count_nonzero(marcado, axis=1)
+            chaves = np.unique(grupos.astype(np.int64) * self.n_ids + valores)
+            return np.bincount(chaves // self.n_ids, minlength=n_grupos)
+        registros = np.zeros((n_grupos, self.m), dtype=np.uint8)
+        np.maximum.at(registros, (grupos, valores), posicoes)
+        estimativa = np.rint(_estimar_hll(registros, self.m)).astype(np.int64)
+        estimativa[registros.max(axis=1) == 0] = 0
+        return estimativa
+
+    def contar_por(self, celulas, grupo_da_celula, n_grupos, linhas=None, grupo_da_linha=None):
+        # Distintos por grupo. 'grupo_da_celula' dá o código do grupo de cada célula selecionada;
+        # 'linhas'/'grupo_da_linha' somam linhas soltas (meses parciais) que não cabem no cubo.
+        posicoes_pares, celula_rel = _expandir(self.ptr, celulas)
+        grupos = grupo_da_celula[celula_rel]
+        valores = self.valores[posicoes_pares]
+        posicoes = self.posicoes[posicoes_pares] if self.modo == 'hll' else None
+
+        if linhas is not None and len(linhas):
+            codigos = self.codigo_da_linha[linhas]
+            grupos = np.concatenate([grupos, grupo_da_linha])
+            if self.modo == 'exato':
+                valores = np.concatenate([valores, codigos])
+            else:
+                valores = np.concatenate([valores, self.registrador_do_id[codigos]])
+                posicoes = np.concatenate([posicoes, self.posicao_do_id[codigos]])
+
+        return self._contar_grupos(grupos, valores, posicoes, n_grupos)
+
+    def contar(self, celulas, linhas=None):
+        zeros_celulas = np.zeros(len(celulas), dtype=np.int64)
+        zeros_linhas = None if linhas is None else np.zeros(len(linhas), dtype=np.int64)
+        return int(self.contar_por(celulas, zeros_celulas, 1, linhas, zeros_linhas)[0])
+
+
+def obter_indice_distintos(dataset, coluna):
+    cubo = obter_cubo(dataset)
+
+    def construir(df):
+        return IndiceDistintos(df[coluna], cubo.celula_da_linha, len(cubo.celulas), fronteiras=particionar(df))
+
+    return dataset.derivado('distintos_' + coluna, construir)
+
+
+def contar_distintos(dataset, coluna, selecao, por=None):
+    # Número de valores distintos de 'coluna' na seleção do cubo (células, linhas);
+    # com 'por', um DataFrame com a contagem por valor da dimensão
+    cubo = obter_cubo(dataset)
+    indice = obter_indice_distintos(dataset, coluna)
+    celulas, linhas = selecao
+
+    if por is None:
+        return indice.contar(celulas, linhas)
+
+    dimensao_celulas = cubo.celulas[por].cat
+    n_grupos = len(dimensao_celulas.categories)
+    grupo_da_celula = dimensao_celulas.codes.to_numpy()[celulas].astype(np.int64)
+    if len(linhas):
+        grupo_da_linha = dataset.df[por].cat.codes.to_numpy()[linhas].astype(np.int64)
+    else:
+        grupo_da_linha = np.zeros(0, dtype=np.int64)
+
+    # Células/linhas sem valor na dimensão (NaN, código -1) ficam de fora, como no groupby
+    validas_c, validas_l = grupo_da_celula >= 0, grupo_da_linha >= 0
+    contagens = indice.contar_por(
+        celulas[validas_c], grupo_da_celula[validas_c], n_grupos,
+        linhas[validas_l], grupo_da_linha[validas_l]
+    )
+    presentes = np.flatnonzero(contagens)
+    return pd.DataFrame({
+        por: dimensao_celulas.categories[presentes].astype(str),
+        coluna: contagens[presentes],
+    })
@@ -0,0 +1,27 @@
+import os
+
+from painel_vendas import vega
+from painel_vendas.instrumentacao import registrar_quadro, secao
+
+# Backend dos gráficos do dashboard:
+#  - 'vega': especificação Vega-Lite desenhada no navegador (padrão, sem custo de CPU no servidor)
+#  - 'matplotlib': imagem renderizada no servidor (mesmo visual da exportação estática)
+BACKEND = os.environ.get('PAINEL_GRAFICOS', 'vega')
+
+BACKENDS = ('vega', 'matplotlib')
+
+
+def exibir(destino, grafico, dados, backend=None, **opcoes):
+    # Exibe o gráfico 'grafico' (nome da função em graficos/vega) em 'destino' (st, coluna, aba...)
+    backend = backend or BACKEND
+    with secao(f'grafico:{grafico}', linhas=len(dados)):
+        registrar_quadro('dados', dados)
+        if backend == 'vega':
+            especificacao = getattr(vega, grafico)(dados, **opcoes)
+            destino.vega_lite_chart(dados, especificacao, width='stretch')
+        elif backend == 'matplotlib':
+            from painel_vendas import graficos
+
+            destino.image(graficos.renderizar(getattr(graficos, grafico), dados, **opcoes), width='stretch')
+        else:
+            raise ValueError(f"Backend de gráficos desconhecido: {backend} (use um de {BACKENDS})")
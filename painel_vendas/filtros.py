@@ -0,0 +1,62 @@
+import datetime
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from painel_vendas.indice_bitmap import obter_indice_bitmap
+from painel_vendas.indice_tempo import obter_indice_tempo
+
+# Estado normalizado dos filtros do dashboard.
+# estados/categorias/status são tuplas ordenadas, ou None quando não há filtro ("Todos").
+Filtros = namedtuple('Filtros', ['data_inicio', 'data_fim', 'estados', 'categorias', 'status'])
+
+# Coluna de estado usada por cada visão: clientes filtram pelo estado do cliente, vendedores pelo do vendedor
+COLUNA_ESTADO = {'clientes': 'customer_state', 'vendedores': 'seller_state'}
+
+# Status marcados por padrão no dashboard (Entregue e Cancelado)
+STATUS_PADRAO = ['delivered', 'canceled']
+
+
+def _normalizar(valores):
+    if valores is None:
+        return None
+    return tuple(sorted(set(valores), key=str))
+
+
+def criar_filtros(data_inicio, data_fim, estados=None, categorias=None, status=None):
+    return Filtros(data_inicio, data_fim, _normalizar(estados), _normalizar(categorias), _normalizar(status))
+
+
+def filtrar_linhas(df, filtros, visao):
+    # Máscara booleana das linhas que atendem aos filtros para a visão ('clientes' ou 'vendedores')
+    datas = df['order_purchase_timestamp']
+    mascara = (
+        (datas >= pd.Timestamp(filtros.data_inicio)) &
+        (datas < pd.Timestamp(filtros.data_fim + datetime.timedelta(days=1)))
+    )
+    if filtros.status is not None:
+        mascara &= df['order_status'].isin(filtros.status)
+    if filtros.estados is not None:
+        mascara &= df[COLUNA_ESTADO[visao]].isin(filtros.estados)
+    if filtros.categorias is not None:
+        mascara &= df['product_category_name'].isin(filtros.categorias)
+    return mascara
+
+
+def filtrar(dataset, filtros, visoes=('clientes', 'vendedores')):
+    # Linhas de cada visão: um slice (quando só a data filtra) ou um array de posições.
+    # O intervalo de datas vira uma fatia contígua (dataset ordenado por data) e os demais
+    # filtros vêm do índice de bitmaps; a parte comum às visões é calculada uma única vez.
+    fatia = obter_indice_tempo(dataset).fatia(filtros.data_inicio, filtros.data_fim)
+    indice = obter_indice_bitmap(dataset)
+    comum = indice.bitmap({'order_status': filtros.status, 'product_category_name': filtros.categorias})
+
+    linhas = {}
+    for visao in visoes:
+        bitmap = indice.bitmap({COLUNA_ESTADO[visao]: filtros.estados}, base=comum)
+        if bitmap is None:
+            linhas[visao] = fatia
+        else:
+            linhas[visao] = np.flatnonzero(indice.mascara(bitmap, fatia)) + fatia.start
+    return linhas
@@ -0,0 +1,152 @@
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+from painel_vendas.indice_tempo import COLUNA_TEMPO, ordenar_por_tempo
+
+# Esquema explícito da tabela de itens de pedido.
+# Colunas que não aparecem aqui são mantidas com o tipo inferido na leitura.
+ESQUEMA = {
+    'order_purchase_timestamp': 'datetime64[ns]',
+    'customer_state': 'category',
+    'seller_state': 'category',
+    'product_category_name': 'category',
+    'order_status': 'category',
+    'order_purchase_year_month': 'category',
+    'order_purchase_year': 'int16',
+    'order_purchase_month': 'int8',
+    'total_price': 'float64',
+}
+
+FORMATOS = {'.feather': 'feather', '.arrow': 'feather', '.parquet': 'parquet'}
+
+
+def aplicar_esquema(df):
+    # Retorna um novo DataFrame com os tipos do ESQUEMA (não altera o original)
+    convertidas = {}
+    for coluna, tipo in ESQUEMA.items():
+        if coluna not in df.columns or str(df[coluna].dtype) == tipo:
+            continue
+        if tipo.startswith('datetime64'):
+            convertidas[coluna] = pd.to_datetime(df[coluna]).astype(tipo)
+        elif tipo == 'category':
+            # Categorias ordenadas deixam os gráficos e filtros com ordem estável
+            convertidas[coluna] = pd.Categorical(df[coluna], categories=sorted(df[coluna].dropna().unique()))
+        else:
+            convertidas[coluna] = df[coluna].astype(tipo)
+    return df.assign(**convertidas) if convertidas else df
+
+
+def validar_delta(delta, referencia):
+    # Confere um lote de linhas novas contra o dataset atual ('referencia') e retorna o lote
+    # com os tipos do ESQUEMA, ordenado por data. Problemas viram ValueError com a descrição.
+    if delta.empty:
+        raise ValueError("O lote de linhas novas está vazio")
+    faltando = [coluna for coluna in referencia.columns if coluna not in delta.columns]
+    sobrando = [coluna for coluna in delta.columns if coluna not in referencia.columns]
+    if faltando or sobrando:
+        raise ValueError(f"Colunas diferentes do dataset: faltando {faltando}, sobrando {sobrando}")
+
+    try:
+        delta = aplicar_esquema(delta[list(referencia.columns)])
+        outras = {
+            coluna: delta[coluna].astype(referencia[coluna].dtype)
+            for coluna in referencia.columns
+            if coluna not in ESQUEMA and delta[coluna].dtype != referencia[coluna].dtype
+        }
+    except (ValueError, TypeError) as erro:
+        raise ValueError(f"Tipos incompatíveis com o esquema: {erro}") from erro
+    delta = delta.assign(**outras) if outras else delta
+
+    for coluna in (COLUNA_TEMPO, 'total_price'):
+        if delta[coluna].isna().any():
+            raise ValueError(f"Valores ausentes em {coluna}")
+
+    # Ano, mês e ano-mês precisam bater com a data da compra: o cubo e o filtro de datas dependem disso
+    datas = delta[COLUNA_TEMPO]
+    coerente = (
+        (datas.dt.year == delta['order_purchase_year']) &
+        (datas.dt.month == delta['order_purchase_month']) &
+        (datas.dt.strftime('%Y-%m') == delta['order_purchase_year_month'].astype(str))
+    )
+    if not coerente.all():
+        raise ValueError(f"{int((~coerente).sum())} linhas com ano/mês diferentes de {COLUNA_TEMPO}")
+    return ordenar_por_tempo(delta)
+
+
+def concatenar(df, delta):
+    # df + delta (mesmas colunas). As colunas categóricas passam a usar a união ordenada das
+    # categorias dos dois lados, para continuarem categóricas (e ordenadas) depois da junção.
+    convertidas_df, convertidas_delta = {}, {}
+    for coluna in df.columns:
+        if not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            continue
+        categorias = df[coluna].cat.categories.union(delta[coluna].cat.categories).sort_values()
+        if not df[coluna].cat.categories.equals(categorias):
+            convertidas_df[coluna] = df[coluna].cat.set_categories(categorias)
+        if not delta[coluna].cat.categories.equals(categorias):
+            convertidas_delta[coluna] = delta[coluna].cat.set_categories(categorias)
+    df = df.assign(**convertidas_df) if convertidas_df else df
+    delta = delta.assign(**convertidas_delta) if convertidas_delta else delta
+    return pd.concat([df, delta], ignore_index=True)
+
+
+def formato_do_arquivo(caminho):
+    return FORMATOS.get(os.path.splitext(caminho)[1].lower())
+
+
+def gravar_colunar(df, destino, formato=None):
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    formato = formato or formato_do_arquivo(destino) or 'feather'
+    # Gravado já ordenado por data, para a carga não precisar reordenar
+    tabela = pa.Table.from_pandas(ordenar_por_tempo(aplicar_esquema(df)), preserve_index=False)
+
+    # Grava em arquivo temporário e renomeia, para nunca deixar um arquivo pela metade
+    diretorio = os.path.dirname(os.path.abspath(destino))
+    os.makedirs(diretorio, exist_ok=True)
+    fd, temporario = tempfile.mkstemp(dir=diretorio, suffix='.tmp')
+    os.close(fd)
+    try:
+        if formato == 'feather':
+            # Sem compressão para que a leitura possa ser feita direto do mapa de memória
+            feather.write_feather(tabela, temporario, compression='uncompressed')
+        elif formato == 'parquet':
+            pq.write_table(tabela, temporario)
+        else:
+            raise ValueError(f"Formato desconhecido: {formato}")
+        os.replace(temporario, destino)
+    except BaseException:
+        os.remove(temporario)
+        raise
+    return destino
+
+
+def ler_colunar(caminho):
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    if formato_do_arquivo(caminho) == 'parquet':
+        tabela = pq.read_table(caminho, memory_map=True)
+    else:
+        tabela = feather.read_table(caminho, memory_map=True)
+    # split_blocks evita consolidar todas as colunas numéricas em um único bloco (cópia extra)
+    return tabela.to_pandas(split_blocks=True)
+
+
+def converter_csv(origem, destino, formato=None):
+    df = pd.read_csv(origem)
+    return gravar_colunar(df, destino, formato)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Converte o CSV de itens de pedido para Feather/Parquet.')
+    parser.add_argument('origem', help='CSV de origem (order_items_cleaned.csv)')
+    parser.add_argument('destino', help='arquivo de destino (.feather ou .parquet)')
+    args = parser.parse_args()
+
+    print(converter_csv(args.origem, args.destino))
@@ -0,0 +1,163 @@
+import hashlib
+import io
+import os
+import threading
+
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+import seaborn as sns
+
+from painel_vendas.cache_resultados import CacheResultados
+from painel_vendas.instrumentacao import secao
+
+# Limite de memória (MB) das imagens já renderizadas, compartilhado por todas as sessões
+LIMITE_MB = int(os.environ.get('PAINEL_CACHE_GRAFICOS_MB', 64))
+
+# Mesmas opções que o st.pyplot usa ao rasterizar uma figura
+OPCOES_SALVAR = {'bbox_inches': 'tight', 'dpi': 200}
+
+cache_graficos = CacheResultados(LIMITE_MB * 1024 * 1024)
+
+# O estado do pyplot (figura atual, rcParams) é global: uma renderização por vez
+_lock_desenho = threading.Lock()
+
+
+def definir_estilo():
+    # Configurações Gerais
+    sns.set_theme()
+    plt.rcParams['figure.figsize'] = (4, 2) # tamanho da figura
+    plt.rcParams['axes.titlesize'] = 8     # tamanho do título
+    plt.rcParams['axes.labelsize'] = 6      # tamanho dos rótulos dos eixos
+    plt.rcParams['xtick.labelsize'] = 6     # tamanhos dos ticks eixo x
+    plt.rcParams['ytick.labelsize'] = 6     # tamanhos dos ticks eixo y
+    plt.rcParams['legend.fontsize'] = 6     # tamanho da fonte das legendas
+    plt.rcParams['lines.markersize'] = 4    # tamanho dos marcadores nas linhas
+
+
+# Aplicado na importação: este módulo só é carregado quando há gráfico matplotlib para desenhar
+definir_estilo()
+
+
+def hash_dados(dados):
+    sha = hashlib.sha1()
+    if isinstance(dados, pd.DataFrame):
+        sha.update(repr(list(dados.columns)).encode())
+    if isinstance(dados, (pd.DataFrame, pd.Series)):
+        sha.update(pd.util.hash_pandas_object(dados, index=True).to_numpy().tobytes())
+    else:
+        sha.update(repr(dados).encode())
+    return sha.hexdigest()
+
+
+def hash_estilo():
+    # Estilo atual do matplotlib/seaborn (aplicado por definir_estilo na importação deste módulo)
+    itens = sorted((chave, repr(valor)) for chave, valor in matplotlib.rcParams.items())
+    return hashlib.sha1(repr(itens).encode()).hexdigest()
+
+
+def renderizar(desenho, dados, formato='png', **opcoes):
+    # Bytes da imagem do gráfico. A chave é (desenho, hash dos dados agregados, estilo, opções),
+    # então gráficos com os mesmos dados não são redesenhados; a figura é fechada logo após salvar.
+    chave = (desenho.__name__, hash_dados(dados), hash_estilo(), formato, repr(sorted(opcoes.items())))
+
+    def calcular():
+        # Só aparece na instrumentação quando o gráfico não estava no cache
+        with secao('renderizar'), _lock_desenho:
+            fig = desenho(dados, **opcoes)
+            try:
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format=formato, **OPCOES_SALVAR)
+                return buffer.getvalue()
+            finally:
+                plt.close(fig)
+
+    return cache_graficos.obter(chave, calcular)
+
+
+def barras(dados, x, y, titulo, xlabel, ylabel):
+    fig, ax = plt.subplots()
+    sns.barplot(data=dados, x=x, y=y, ax=ax)
+    ax.set_title(titulo)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    return fig
+
+
+def linha(dados, x, y, titulo, xlabel, ylabel):
+    fig, ax = plt.subplots()
+    sns.lineplot(data=dados, x=x, y=y, ax=ax)
+    ax.set_title(titulo)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.tick_params(axis='x', rotation=60)
+    return fig
+
+
+def barras_categoria(dados, media):
+    fig, ax = plt.subplots(figsize=(6, 3))  # Reduzindo o tamanho do gráfico
+    sns.barplot(data=dados, x='product_category_name', y='total_price', ax=ax, palette='viridis')
+    ax.axhline(media, color='red', linestyle='--', label=f'Média de Vendas das categorias: {media:,.2f}')  # Linha da média
+    ax.set_xlabel('Categoria', fontsize=6)
+    ax.set_ylabel('Total de Vendas (R$)', fontsize=8)
+    ax.set_title('Vendas por Categoria', fontsize=8)
+    ax.tick_params(axis='x', rotation=80)  # Rotacionar os rótulos do eixo X para melhor visualização
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def comparacao_periodos(dados, titulo, xlabel='Categoria', legenda='Ano'):
+    # Barras lado a lado (uma cor por período) indexadas pela dimensão (primeira coluna)
+    fig, ax = plt.subplots()
+    # Sem vendas nos dois períodos (filtro sem linhas) fica só o gráfico vazio
+    if not dados.empty:
+        dados.set_index(dados.columns[0]).plot(kind='bar', ax=ax, color=['skyblue', 'orange'])
+        ax.legend(title=legenda)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel('Total de Vendas (R$)')
+    ax.set_title(titulo)
+    ax.tick_params(axis='x', rotation=80)
+    ax.tick_params(axis='y')
+    return fig
+
+
+def histograma_fotos(dados):
+    fig, ax = plt.subplots()
+
+    # Sem pedidos no filtro fica só o gráfico vazio (o histograma não aceita dados vazios)
+    if dados.empty:
+        ax.set_title('Relação entre Quantidade de Fotos e Pedidos Únicos')
+        return fig
+
+    if dados['product_photos_qty'].nunique() < 2:
+        # Um só valor de fotos (comum por estado x mês): o seaborn não calcula as faixas nem a
+        # KDE sem amplitude, então fica a barra da faixa [valor, valor + 1), como no histograma
+        ax.bar(
+            dados['product_photos_qty'], dados['quantidade_pedidos'],
+            width=1, align='edge', color='blue', alpha=0.6
+        )
+    else:
+        # Histograma com KDE
+        sns.histplot(
+            data=dados,
+            x='product_photos_qty',
+            weights='quantidade_pedidos',  # Peso para refletir a quantidade de pedidos
+            binwidth=1,
+            kde=True,  # Adiciona a linha KDE
+            ax=ax,
+            color='blue',
+            alpha=0.6,
+            line_kws={'color': 'red', 'linewidth': 1}  # Configurações da linha KDE
+        )
+
+    ax.set_xlabel('Quantidade de Fotos')
+    # Definir os ticks do eixo X como números inteiros
+    ax.set_xticks(range(int(dados['product_photos_qty'].min()), int(dados['product_photos_qty'].max()) + 1))
+    ax.set_xticklabels([str(int(x)) for x in ax.get_xticks()])  # Garantir que os rótulos sejam inteiros
+
+    ax.set_ylabel('Quantidade de Pedidos Únicos')
+    ax.set_title('Relação entre Quantidade de Fotos e Pedidos Únicos')
+    ax.tick_params(axis='x')
+    ax.tick_params(axis='y')
+    return fig
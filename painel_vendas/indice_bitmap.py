@@ -0,0 +1,114 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Dimensões filtráveis pela barra lateral
+DIMENSOES = ['customer_state', 'seller_state', 'product_category_name', 'order_status']
+
+
+def _posicoes_por_codigo(codigos, n_categorias):
+    # Agrupa as posições por código com uma única ordenação (código -1 = valor ausente)
+    ordem = np.argsort(codigos, kind='stable')
+    limites = np.searchsorted(codigos[ordem], np.arange(-1, n_categorias + 1))
+    posicoes = {}
+    for codigo in range(-1, n_categorias):
+        if limites[codigo + 2] > limites[codigo + 1]:
+            posicoes[codigo] = ordem[limites[codigo + 1]:limites[codigo + 2]]
+    return posicoes
+
+
+def _estender(bitmap, n_linhas, bits):
+    # Bitmap compactado de 'n_linhas' linhas seguido dos bits novos, sem desempacotar o resto
+    resto = n_linhas % 8
+    if resto:
+        bits = np.concatenate([np.unpackbits(bitmap[-1:])[:resto].view(bool), bits])
+        bitmap = bitmap[:-1]
+    return np.concatenate([bitmap, np.packbits(bits)])
+
+
+class IndiceBitmap:
+    # Um bitmap (compactado com np.packbits, 1 bit por linha) para cada valor de cada dimensão.
+    # Uma seleção é respondida com OR dos bitmaps dentro da dimensão e AND entre dimensões.
+
+    def __init__(self, df, dimensoes=DIMENSOES):
+        self.n_linhas = len(df)
+        self.categorias = {}
+        self.bitmaps = {}
+        for coluna in dimensoes:
+            categorico = pd.Categorical(df[coluna])
+            bitmaps = {}
+            for codigo, posicoes in _posicoes_por_codigo(categorico.codes, len(categorico.categories)).items():
+                bits = np.zeros(self.n_linhas, dtype=bool)
+                bits[posicoes] = True
+                bitmaps[codigo] = np.packbits(bits)
+            self.categorias[coluna] = categorico.categories
+            self.bitmaps[coluna] = bitmaps
+
+    def anexar(self, dataset, inicio):
+        # Índice da nova versão do dataset: os bitmaps existentes só ganham os bits das linhas
+        # a partir de 'inicio' (com os códigos remapeados se surgiram categorias novas)
+        df = dataset.df
+        novo = copy.copy(self)
+        novo.n_linhas = len(df)
+        novo.categorias = {}
+        novo.bitmaps = {}
+        vazio = np.zeros((inicio + 7) // 8, dtype=np.uint8)
+        for coluna, bitmaps in self.bitmaps.items():
+            categorico = pd.Categorical(df[coluna])
+            destino = categorico.categories.get_indexer(self.categorias[coluna])
+            antigos = {(int(destino[codigo]) if codigo >= 0 else -1): bits for codigo, bits in bitmaps.items()}
+            novas = _posicoes_por_codigo(categorico.codes[inicio:], len(categorico.categories))
+
+            novo.bitmaps[coluna] = {}
+            for codigo in set(antigos) | set(novas):
+                bits = np.zeros(novo.n_linhas - inicio, dtype=bool)
+                if codigo in novas:
+                    bits[novas[codigo]] = True
+                novo.bitmaps[coluna][codigo] = _estender(antigos.get(codigo, vazio), inicio, bits)
+            novo.categorias[coluna] = categorico.categories
+        return novo
+
+    def valores(self, coluna):
+        # Valores presentes na dimensão (ordenados), para montar as opções dos filtros
+        return [self.categorias[coluna][codigo] for codigo in sorted(self.bitmaps[coluna]) if codigo >= 0]
+
+    def _codigos(self, coluna, valores):
+        # get_indexer devolve -1 para valores fora das categorias, o mesmo código dos ausentes:
+        # o -1 só entra quando o próprio valor ausente (NaN) foi selecionado
+        codigos = set(self.categorias[coluna].get_indexer([v for v in valores if not pd.isna(v)]))
+        codigos.discard(-1)
+        if any(pd.isna(v) for v in valores):
+            codigos.add(-1)
+        return codigos & set(self.bitmaps[coluna])
+
+    def bitmap(self, selecoes, base=None):
+        # Bitmap compactado das linhas que atendem a 'selecoes' ({coluna: valores ou None}).
+        # Retorna None quando nenhuma dimensão restringe (todas as linhas).
+        resultado = base
+        for coluna, valores in selecoes.items():
+            if valores is None:
+                continue
+            codigos = self._codigos(coluna, valores)
+            if len(codigos) == len(self.bitmaps[coluna]):
+                continue  # seleção com todos os valores não filtra nada
+            if codigos:
+                uniao = np.bitwise_or.reduce([self.bitmaps[coluna][c] for c in codigos])
+            else:
+                uniao = np.zeros((self.n_linhas + 7) // 8, dtype=np.uint8)
+            resultado = uniao if resultado is None else resultado & uniao
+        return resultado
+
+    def mascara(self, bitmap, fatia=slice(None)):
+        # Converte o bitmap compactado para máscara booleana das linhas da fatia (None -> todas)
+        inicio, fim, _ = fatia.indices(self.n_linhas)
+        if bitmap is None:
+            return np.ones(fim - inicio, dtype=bool)
+        # Desempacota só os bytes que cobrem a fatia
+        bits = np.unpackbits(bitmap[inicio // 8:(fim + 7) // 8]).view(bool)
+        deslocamento = inicio % 8
+        return bits[deslocamento:deslocamento + fim - inicio]
+
+
+def obter_indice_bitmap(dataset):
+    return dataset.derivado('indice_bitmap', IndiceBitmap)
@@ -0,0 +1,58 @@
+import copy
+import datetime
+
+import numpy as np
+import pandas as pd
+
+COLUNA_TEMPO = 'order_purchase_timestamp'
+
+
+def ordenar_por_tempo(df):
+    # O dataset é mantido ordenado pela data da compra para que um intervalo de datas
+    # seja sempre um bloco contíguo de linhas
+    if df[COLUNA_TEMPO].is_monotonic_increasing:
+        return df
+    return df.sort_values(COLUNA_TEMPO, kind='stable', ignore_index=True)
+
+
+def _nanossegundos(df):
+    return df[COLUNA_TEMPO].to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+class IndiceTempo:
+    # Resolve o intervalo do slider de datas para uma fatia de linhas com busca binária
+    # sobre os nanossegundos (int64) da coluna de data, sem criar objetos date por linha.
+
+    def __init__(self, df):
+        self.ns = _nanossegundos(df)
+        if len(self.ns) > 1 and np.any(self.ns[1:] < self.ns[:-1]):
+            raise ValueError(f"O dataset precisa estar ordenado por {COLUNA_TEMPO} (use ordenar_por_tempo)")
+
+    def anexar(self, dataset, inicio):
+        # Índice da nova versão do dataset: só as linhas a partir de 'inicio' são convertidas
+        novos = _nanossegundos(dataset.df.iloc[inicio:])
+        if len(novos) and len(self.ns) and (novos[0] < self.ns[-1] or np.any(novos[1:] < novos[:-1])):
+            raise ValueError(f"As linhas anexadas precisam vir depois das existentes em {COLUNA_TEMPO}")
+        novo = copy.copy(self)
+        novo.ns = np.concatenate([self.ns[:inicio], novos])
+        return novo
+
+    def data_min(self):
+        return pd.Timestamp(self.ns[0]).date()
+
+    def data_max(self):
+        return pd.Timestamp(self.ns[-1]).date()
+
+    def posicao(self, instante):
+        # Primeira linha com data >= instante
+        return int(np.searchsorted(self.ns, pd.Timestamp(instante).value, side='left'))
+
+    def fatia(self, data_inicio, data_fim):
+        # Linhas com data_inicio <= data da compra <= data_fim (datas inclusivas, como no slider)
+        inicio = self.posicao(data_inicio)
+        fim = self.posicao(data_fim + datetime.timedelta(days=1))
+        return slice(inicio, max(inicio, fim))
+
+
+def obter_indice_tempo(dataset):
+    return dataset.derivado('indice_tempo', IndiceTempo)
@@ -0,0 +1,306 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+from painel_vendas.cache_resultados import cache, tamanho_em_bytes
+
+# Liga a medição em todas as sessões (além do parâmetro ?dev=1 na URL)
+ATIVO = os.environ.get('PAINEL_INSTRUMENTACAO', '') not in ('', '0')
+
+# Arquivo JSON Lines onde as seções de cada rerun medido são acrescentadas (opcional)
+ARQUIVO = os.environ.get('PAINEL_INSTRUMENTACAO_ARQUIVO')
+
+# Modo memória: tracemalloc por seção, tamanho dos DataFrames, figuras matplotlib abertas e
+# comparação entre reruns consecutivos. Só pela variável de ambiente: o rastreamento deixa o
+# processo inteiro mais lento e os números são do processo, não da sessão
+MEMORIA = os.environ.get('PAINEL_MEMORIA', '') not in ('', '0')
+
+# Crescimento (MB, descontado o que foi para os caches) a partir do qual um rerun conta como
+# "cresceu"; RERUNS_VAZAMENTO reruns seguidos crescendo são sinalizados como possível vazamento
+LIMIAR_CRESCIMENTO_MB = float(os.environ.get('PAINEL_MEMORIA_LIMIAR_MB', 1))
+RERUNS_VAZAMENTO = 3
+
+# Cada sessão do Streamlit roda o script na sua própria thread: o rastreador ativo é por thread
+_local = threading.local()
+_lock_arquivo = threading.Lock()
+
+# Histórico do processo (a memória é do processo, não da sessão) para comparar reruns
+_historico = deque(maxlen=20)
+
+# O tracemalloc (memória atual, pico) é um só para o processo: os reruns no modo memória rodam
+# um de cada vez, e o rastreamento fica ligado só enquanto um deles está rodando
+_lock_rerun_memoria = threading.Lock()
+
+
+class Trecho:
+    # Uma seção medida: nome, profundidade na pilha, duração e (opcional) número de linhas.
+    # No modo memória: bytes alocados que ficaram (alocado), pico acima do início (pico) e
+    # tamanho profundo dos DataFrames registrados na seção (quadros)
+    __slots__ = (
+        'nome', 'caminho', 'profundidade', 'inicio', 'duracao', 'linhas',
+        'memoria_inicio', 'pico_absoluto', 'alocado', 'pico', 'quadros',
+    )
+
+    def __init__(self, nome, caminho, profundidade, linhas=None):
+        self.nome = nome
+        self.caminho = caminho
+        self.profundidade = profundidade
+        self.inicio = time.time()
+        self.duracao = None
+        self.linhas = linhas
+        self.alocado = None
+        self.pico = None
+        self.quadros = {}
+
+
+class Rastreador:
+    # Seções de um rerun, na ordem em que começaram
+
+    def __init__(self, memoria=False):
+        self.id = uuid.uuid4().hex[:12]
+        self.inicio = time.perf_counter()
+        self.fim = None
+        self.trechos = []
+        self._pilha = []
+        self.memoria = memoria
+        self.resumo_memoria = None
+        self.guardados_inicio = _bytes_guardados() if memoria else None
+
+    def duracao(self):
+        return (self.fim or time.perf_counter()) - self.inicio
+
+    def tabela(self):
+        colunas = {
+            'seção': ['· ' * t.profundidade + t.nome for t in self.trechos],
+            'ms': [None if t.duracao is None else round(t.duracao * 1000, 1) for t in self.trechos],
+            'linhas': pd.array([t.linhas for t in self.trechos], dtype='Int64'),
+        }
+        if self.memoria:
+            colunas['alocado_kb'] = [_kb(t.alocado) for t in self.trechos]
+            colunas['pico_kb'] = [_kb(t.pico) for t in self.trechos]
+            colunas['quadros_kb'] = [_kb(sum(t.quadros.values())) if t.quadros else None for t in self.trechos]
+        return pd.DataFrame(colunas)
+
+
+def _kb(n_bytes):
+    return None if n_bytes is None else round(n_bytes / 1024, 1)
+
+
+def ativa(query_params=None):
+    # Medição ligada pela variável de ambiente ou por ?dev=1 na URL (o modo memória também liga)
+    return ATIVO or MEMORIA or (
+        query_params is not None and query_params.get('dev') in ('1', 'true')
+    )
+
+
+def iniciar(memoria=False):
+    # No modo memória espera os reruns medidos das outras sessões terminarem e liga o
+    # tracemalloc; finalizar (ou abandonar) desliga e libera o próximo
+    if memoria:
+        _lock_rerun_memoria.acquire()
+        tracemalloc.start()
+    _local.rastreador = Rastreador(memoria=memoria)
+    return _local.rastreador
+
+
+def _liberar_memoria():
+    tracemalloc.stop()
+    _lock_rerun_memoria.release()
+
+
+def abandonar():
+    # Rerun interrompido (st.rerun, st.stop, exceção) antes de finalizar: descarta as medições
+    rastreador = getattr(_local, 'rastreador', None)
+    _local.rastreador = None
+    if rastreador is not None and rastreador.memoria:
+        _liberar_memoria()
+
+
+def finalizar(arquivo=ARQUIVO):
+    # Encerra o rerun da thread atual; com 'arquivo', acrescenta uma linha JSON por seção
+    rastreador = getattr(_local, 'rastreador', None)
+    _local.rastreador = None
+    if rastreador is None:
+        return None
+    rastreador.fim = time.perf_counter()
+    if rastreador.memoria:
+        try:
+            rastreador.resumo_memoria = _comparar_com_reruns_anteriores(rastreador)
+        finally:
+            _liberar_memoria()
+    if arquivo:
+        gravar_jsonl(rastreador, arquivo)
+    return rastreador
+
+
+def figuras_abertas():
+    # Figuras matplotlib vivas no processo (sem importar o pyplot se ninguém importou)
+    pyplot = sys.modules.get('matplotlib.pyplot')
+    return len(pyplot.get_fignums()) if pyplot is not None else 0
+
+
+def _caches():
+    caches = [cache]
+    graficos = sys.modules.get('painel_vendas.graficos')
+    if graficos is not None:
+        caches.append(graficos.cache_graficos)
+    return [c.estatisticas() for c in caches]
+
+
+def _bytes_em_cache():
+    return sum(estatisticas['bytes'] for estatisticas in _caches())
+
+
+def _bytes_guardados():
+    return sum(estatisticas['bytes_guardados'] for estatisticas in _caches())
+
+
+def _comparar_com_reruns_anteriores(rastreador):
+    # O tracemalloc foi ligado no início do rerun: a memória rastreada no fim é o que o rerun
+    # alocou e continua vivo. O que ele guardou nos caches de resultados/gráficos (limitados)
+    # não conta como crescimento; as linhas que mais alocaram vêm do retrato deste rerun.
+    atual, pico = tracemalloc.get_traced_memory()
+    retrato = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+    ])
+    medicao = {
+        'crescimento': atual - (_bytes_guardados() - rastreador.guardados_inicio),
+        'figuras': figuras_abertas(),
+    }
+    maiores = [str(estatistica) for estatistica in retrato.statistics('lineno')[:5]]
+    _historico.append(medicao)
+
+    # Possível vazamento: memória (fora dos caches) ou figuras crescendo em reruns seguidos
+    recentes = list(_historico)[-(RERUNS_VAZAMENTO + 1):]
+    crescendo = len(recentes) > RERUNS_VAZAMENTO and all(
+        m['crescimento'] > LIMIAR_CRESCIMENTO_MB * 2 ** 20 for m in recentes[1:]
+    )
+    figuras_crescendo = len(recentes) > RERUNS_VAZAMENTO and all(
+        depois['figuras'] > antes['figuras'] for antes, depois in zip(recentes, recentes[1:])
+    )
+    return {
+        'atual': atual,
+        'pico': pico,
+        'cache': _bytes_em_cache(),
+        'figuras': medicao['figuras'],
+        'crescimento': medicao['crescimento'],
+        'vazamento': crescendo or figuras_crescendo,
+        'maiores_aumentos': maiores,
+    }
+
+
+@contextmanager
+def secao(nome, linhas=None):
+    # Mede o bloco como uma seção do rerun atual (aninhada na seção aberta, se houver).
+    # O trecho retornado aceita 'linhas' depois de calculado. Sem rerun medido, só executa o bloco.
+    rastreador = getattr(_local, 'rastreador', None)
+    if rastreador is None:
+        yield Trecho(nome, nome, 0, linhas)
+        return
+
+    pilha = rastreador._pilha
+    caminho = pilha[-1].caminho + '/' + nome if pilha else nome
+    trecho = Trecho(nome, caminho, len(pilha), linhas)
+    rastreador.trechos.append(trecho)
+    if rastreador.memoria:
+        _iniciar_memoria(trecho, pilha)
+    pilha.append(trecho)
+    inicio = time.perf_counter()
+    try:
+        yield trecho
+    finally:
+        trecho.duracao = time.perf_counter() - inicio
+        pilha.pop()
+        if rastreador.memoria:
+            _encerrar_memoria(trecho, pilha)
+
+
+def _iniciar_memoria(trecho, pilha):
+    # O pico do tracemalloc é um só: antes de zerá-lo para esta seção, guarda o pico
+    # que a seção de fora já tinha atingido
+    atual, pico = tracemalloc.get_traced_memory()
+    if pilha:
+        pilha[-1].pico_absoluto = max(pilha[-1].pico_absoluto, pico)
+    tracemalloc.reset_peak()
+    trecho.memoria_inicio = atual
+    trecho.pico_absoluto = atual
+
+
+def _encerrar_memoria(trecho, pilha):
+    atual, pico = tracemalloc.get_traced_memory()
+    trecho.pico_absoluto = max(trecho.pico_absoluto, pico)
+    trecho.alocado = atual - trecho.memoria_inicio
+    trecho.pico = trecho.pico_absoluto - trecho.memoria_inicio
+    if pilha:
+        pilha[-1].pico_absoluto = max(pilha[-1].pico_absoluto, trecho.pico_absoluto)
+
+
+def registrar_quadro(nome, valor):
+    # Tamanho profundo (memory_usage deep) de um DataFrame/Series (ou tupla/dict deles)
+    # criado na seção aberta. Só calcula no modo memória.
+    rastreador = getattr(_local, 'rastreador', None)
+    if rastreador is None or not rastreador.memoria or not rastreador._pilha:
+        return
+    rastreador._pilha[-1].quadros[nome] = tamanho_em_bytes(valor)
+
+
+def medido(nome=None):
+    # Decorador: cada chamada da função vira uma seção com o nome dela
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with secao(nome or funcao.__name__):
+                resultado = funcao(*args, **kwargs)
+                if isinstance(resultado, (pd.DataFrame, pd.Series)):
+                    registrar_quadro('retorno', resultado)
+                return resultado
+        return envolvida
+    return decorador
+
+
+def gravar_jsonl(rastreador, arquivo):
+    linhas = [
+        json.dumps({
+            'rerun': rastreador.id,
+            'inicio': round(t.inicio, 6),
+            'secao': t.caminho,
+            'profundidade': t.profundidade,
+            'ms': None if t.duracao is None else round(t.duracao * 1000, 3),
+            'linhas': t.linhas,
+            **({'alocado': t.alocado, 'pico': t.pico, 'quadros': t.quadros} if rastreador.memoria else {}),
+        }, ensure_ascii=False)
+        for t in rastreador.trechos
+    ]
+    with _lock_arquivo, open(arquivo, 'a', encoding='utf-8') as saida:
+        saida.write('\n'.join(linhas) + '\n')
+
+
+def exibir_painel(destino, rastreador):
+    # Painel de desenvolvimento (normalmente st.sidebar) com as seções do rerun
+    destino.subheader('Instrumentação')
+    destino.caption(f"Rerun {rastreador.id}: {rastreador.duracao() * 1000:,.0f} ms")
+    memoria = rastreador.resumo_memoria
+    if memoria:
+        destino.caption(
+            f"Alocado no rerun e ainda vivo: {memoria['atual'] / 2 ** 20:,.1f} MB "
+            f"(caches {memoria['cache'] / 2 ** 20:,.1f} MB) · "
+            f"crescimento fora dos caches: {memoria['crescimento'] / 2 ** 20:+,.1f} MB · "
+            f"figuras abertas: {memoria['figuras']}"
+        )
+        if memoria['vazamento']:
+            destino.warning(
+                f"Possível vazamento: memória ou figuras crescendo em {RERUNS_VAZAMENTO} reruns seguidos."
+            )
+        if memoria['maiores_aumentos']:
+            destino.code('\n'.join(memoria['maiores_aumentos']), language=None)
+    destino.dataframe(rastreador.tabela(), hide_index=True)
@@ -0,0 +1,47 @@
+from collections import namedtuple
+
+from painel_vendas.cubo import consolidar, obter_cubo
+from painel_vendas.distintos import contar_distintos
+
+# Todos os indicadores e agregações que as abas do dashboard exibem
+Metricas = namedtuple('Metricas', [
+    'total_vendas',
+    'clientes_unicos',
+    'vendedores_unicos',
+    'vendas_estado',
+    'clientes_estado',
+    'vendedores_estado',
+    'vendas_mes',
+    'clientes_mes',
+    'vendedores_mes',
+    'vendas_categoria',
+    'media_categorias',
+])
+
+
+def calcular_metricas(dataset, selecao_clientes, selecao_vendedores):
+    # Calcula tudo de uma vez: cada visão é selecionada uma única vez no cubo e as
+    # somas/distintos saem dessa mesma seleção, em vez de cada gráfico refazer a conta.
+    cubo = obter_cubo(dataset)
+    dados = cubo.dados(selecao_clientes)
+
+    vendas_categoria = consolidar(dados, 'product_category_name')[['product_category_name', 'total_price']]
+    vendas_categoria = vendas_categoria.sort_values(by='total_price', ascending=False, ignore_index=True)
+    total_vendas = consolidar(dados)['total_price']
+
+    return Metricas(
+        total_vendas=total_vendas,
+        clientes_unicos=contar_distintos(dataset, 'customer_unique_id', selecao_clientes),
+        vendedores_unicos=contar_distintos(dataset, 'seller_id', selecao_vendedores),
+        vendas_estado=consolidar(dados, 'customer_state')[['customer_state', 'total_price']],
+        clientes_estado=contar_distintos(dataset, 'customer_unique_id', selecao_clientes, por='customer_state'),
+        vendedores_estado=contar_distintos(dataset, 'seller_id', selecao_vendedores, por='seller_state'),
+        vendas_mes=consolidar(dados, 'order_purchase_year_month')[['order_purchase_year_month', 'total_price']],
+        clientes_mes=contar_distintos(
+            dataset, 'customer_unique_id', selecao_clientes, por='order_purchase_year_month'
+        ),
+        vendedores_mes=contar_distintos(dataset, 'seller_id', selecao_vendedores, por='order_purchase_year_month'),
+        vendas_categoria=vendas_categoria,
+        # Média de vendas por categoria (considerando as categorias com vendas no filtro)
+        media_categorias=total_vendas / len(vendas_categoria) if len(vendas_categoria) else 0.0,
+    )
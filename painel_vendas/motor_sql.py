@@ -0,0 +1,177 @@
+import datetime
+import threading
+
+import pandas as pd
+
+from painel_vendas.comparacao import selecionar_top
+from painel_vendas.consultas import Consulta
+from painel_vendas.filtros import COLUNA_ESTADO
+from painel_vendas.formato_colunar import formato_do_arquivo
+from painel_vendas.indice_tempo import COLUNA_TEMPO
+from painel_vendas.instrumentacao import secao
+from painel_vendas.metricas import Metricas
+
+# Conexão DuckDB em memória, uma por processo (criada no primeiro uso)
+_conexao = None
+_lock = threading.Lock()
+
+
+def _cursor():
+    # Cada consulta usa um cursor próprio: a conexão é compartilhada, o cursor não (threads das sessões)
+    global _conexao
+    with _lock:
+        if _conexao is None:
+            import duckdb
+
+            _conexao = duckdb.connect()
+        return _conexao.cursor()
+
+
+def obter_fonte(dataset):
+    # Dataset do pyarrow sobre os arquivos colunares (abertos como mapa de memória). O DuckDB lê
+    # só as colunas usadas e aplica os filtros na leitura, com varredura em várias threads.
+    def construir(df):
+        import pyarrow.dataset as pads
+
+        por_formato = {}
+        for arquivo in dataset.arquivos:
+            por_formato.setdefault(formato_do_arquivo(arquivo), []).append(arquivo)
+        fontes = [pads.dataset(arquivos, format=formato) for formato, arquivos in por_formato.items()]
+        return fontes[0] if len(fontes) == 1 else pads.dataset(fontes)
+
+    return dataset.derivado('fonte_sql', construir)
+
+
+def _instante(data):
+    return datetime.datetime.combine(data, datetime.time())
+
+
+def condicoes(filtros, visao):
+    # Cláusula WHERE (com parâmetros) equivalente a filtrar_linhas para a visão
+    partes = [f'{COLUNA_TEMPO} >= ?', f'{COLUNA_TEMPO} < ?']
+    parametros = [_instante(filtros.data_inicio), _instante(filtros.data_fim + datetime.timedelta(days=1))]
+    for coluna, valores in (
+        ('order_status', filtros.status),
+        (COLUNA_ESTADO[visao], filtros.estados),
+        ('product_category_name', filtros.categorias),
+    ):
+        if valores is None:
+            continue
+        if not valores:
+            partes.append('FALSE')
+            continue
+        partes.append(f"{coluna} IN ({', '.join('?' * len(valores))})")
+        parametros.extend(valores)
+    return ' AND '.join(partes), parametros
+
+
+def _por_grupo(resultado, conjunto, coluna, valor, nome_valor):
+    # Linhas de um grouping set, no formato de consolidar/contar_distintos (rótulos como texto,
+    # ordenados, sem o grupo sem valor)
+    parte = resultado[(resultado['conjunto'] == conjunto) & resultado[coluna].notna()]
+    parte = parte[[coluna, valor]].rename(columns={valor: nome_valor}).sort_values(coluna, ignore_index=True)
+    parte[coluna] = parte[coluna].astype(str)
+    return parte
+
+
+class ConsultaSQL(Consulta):
+    # Mesmas perguntas da Consulta, respondidas com SQL sobre os arquivos do dataset.
+    # Os resultados têm o mesmo formato (e o mesmo cache de resultados, em chaves próprias);
+    # a tabela de linhas continua vindo do índice em memória. Os distintos são sempre exatos
+    # (o modo 'hll' de PAINEL_DISTINTOS só vale para as estruturas em memória).
+    motor = 'duckdb'
+
+    def _executar(self, sql, parametros):
+        with secao('sql') as trecho:
+            cursor = _cursor()
+            try:
+                cursor.register('itens', obter_fonte(self.dataset))
+                resultado = cursor.execute(sql, parametros).df()
+            finally:
+                cursor.close()
+            trecho.linhas = len(resultado)
+        return resultado
+
+    def _calcular_metricas(self):
+        onde, parametros = condicoes(self.filtros, 'clientes')
+        # GROUPING(...) identifica o conjunto: 7 = total, 3 = estado, 5 = mês, 6 = categoria
+        clientes = self._executar(f"""
+            SELECT GROUPING(customer_state, order_purchase_year_month, product_category_name) AS conjunto,
+                   CAST(customer_state AS VARCHAR) AS customer_state,
+                   CAST(order_purchase_year_month AS VARCHAR) AS order_purchase_year_month,
+                   CAST(product_category_name AS VARCHAR) AS product_category_name,
+                   SUM(total_price) AS total_price,
+                   COUNT(DISTINCT customer_unique_id) AS distintos
+            FROM itens
+            WHERE {onde}
+            GROUP BY GROUPING SETS ((), (customer_state), (order_purchase_year_month), (product_category_name))
+        """, parametros)
+
+        onde, parametros = condicoes(self.filtros, 'vendedores')
+        # 3 = total, 1 = estado, 2 = mês
+        vendedores = self._executar(f"""
+            SELECT GROUPING(seller_state, order_purchase_year_month) AS conjunto,
+                   CAST(seller_state AS VARCHAR) AS seller_state,
+                   CAST(order_purchase_year_month AS VARCHAR) AS order_purchase_year_month,
+                   COUNT(DISTINCT seller_id) AS distintos
+            FROM itens
+            WHERE {onde}
+            GROUP BY GROUPING SETS ((), (seller_state), (order_purchase_year_month))
+        """, parametros)
+
+        total = clientes[clientes['conjunto'] == 7].iloc[0]
+        total_vendas = float(total['total_price']) if pd.notna(total['total_price']) else 0.0
+        vendas_categoria = _por_grupo(clientes, 6, 'product_category_name', 'total_price', 'total_price')
+        vendas_categoria = vendas_categoria.sort_values(by='total_price', ascending=False, ignore_index=True)
+
+        def contagens(resultado, conjunto, coluna, nome):
+            parte = _por_grupo(resultado, conjunto, coluna, 'distintos', nome)
+            parte[nome] = parte[nome].astype('int64')
+            return parte[parte[nome] > 0].reset_index(drop=True)
+
+        return Metricas(
+            total_vendas=total_vendas,
+            clientes_unicos=int(total['distintos']),
+            vendedores_unicos=int(vendedores.loc[vendedores['conjunto'] == 3, 'distintos'].iloc[0]),
+            vendas_estado=_por_grupo(clientes, 3, 'customer_state', 'total_price', 'total_price'),
+            clientes_estado=contagens(clientes, 3, 'customer_state', 'customer_unique_id'),
+            vendedores_estado=contagens(vendedores, 1, 'seller_state', 'seller_id'),
+            vendas_mes=_por_grupo(clientes, 5, 'order_purchase_year_month', 'total_price', 'total_price'),
+            clientes_mes=contagens(clientes, 5, 'order_purchase_year_month', 'customer_unique_id'),
+            vendedores_mes=contagens(vendedores, 2, 'order_purchase_year_month', 'seller_id'),
+            vendas_categoria=vendas_categoria,
+            media_categorias=total_vendas / len(vendas_categoria) if len(vendas_categoria) else 0.0,
+        )
+
+    def _calcular_comparacao(self, periodo_a, periodo_b, dimensao, top_n):
+        visao = 'vendedores' if dimensao == 'seller_state' else 'clientes'
+        onde, parametros = condicoes(self.filtros, visao)
+        # Cada período vai do primeiro instante do mês inicial ao primeiro instante do mês seguinte ao final
+        intervalos = []
+        for p in (periodo_a, periodo_b):
+            intervalos += [p.inicio.start_time.to_pydatetime(), (p.fim + 1).start_time.to_pydatetime()]
+        no_periodo = f'{COLUNA_TEMPO} >= ? AND {COLUNA_TEMPO} < ?'
+        resultado = self._executar(f"""
+            SELECT CAST({dimensao} AS VARCHAR) AS dimensao,
+                   SUM(CASE WHEN {no_periodo} THEN total_price END) AS periodo_a,
+                   SUM(CASE WHEN {no_periodo} THEN total_price END) AS periodo_b
+            FROM itens
+            WHERE {onde} AND {dimensao} IS NOT NULL AND (({no_periodo}) OR ({no_periodo}))
+            GROUP BY 1
+            ORDER BY 1
+        """, intervalos + parametros + intervalos)
+
+        tabela = resultado.set_index('dimensao').rename(
+            columns={'periodo_a': periodo_a.rotulo, 'periodo_b': periodo_b.rotulo}
+        ).rename_axis(dimensao)
+        return selecionar_top(tabela, periodo_a, periodo_b, dimensao, top_n)
+
+    def _calcular_pedidos_por_fotos(self):
+        onde, parametros = condicoes(self.filtros, 'clientes')
+        return self._executar(f"""
+            SELECT product_photos_qty, COUNT(DISTINCT order_id) AS quantidade_pedidos
+            FROM itens
+            WHERE {onde} AND product_photos_qty IS NOT NULL
+            GROUP BY 1
+            ORDER BY 1
+        """, parametros)
@@ -0,0 +1,116 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Processos usados para construir o cubo e as estruturas de distintos em bases grandes:
+# 1 (padrão) mantém tudo no processo do servidor; 0 usa um processo por núcleo
+PROCESSOS = int(os.environ.get('PAINEL_PROCESSOS', 1))
+
+# Abaixo deste número de linhas o custo de subir os processos e gravar as partições não compensa
+LINHAS_MINIMAS = int(os.environ.get('PAINEL_PROCESSOS_MINIMO', 2_000_000))
+
+# Partições por processo: partições menores equilibram melhor meses de tamanhos diferentes
+PARTICOES_POR_PROCESSO = 2
+
+COLUNA_MES = 'order_purchase_year_month'
+
+_executor = None
+_lock_executor = threading.Lock()
+
+
+def processos():
+    return PROCESSOS if PROCESSOS > 0 else os.cpu_count() or 1
+
+
+def particionar(df):
+    # Intervalos de linhas (inicio, fim) por grupos de meses inteiros, com tamanhos parecidos.
+    # Com o dataset ordenado por data, cada mês é um bloco contíguo: as partições são fatias
+    # dos arquivos mapeados, sem cópia, e células do cubo de partições diferentes nunca se
+    # repetem. Retorna None quando a base deve ser processada no próprio processo.
+    n_processos = processos()
+    if n_processos <= 1 or len(df) < LINHAS_MINIMAS:
+        return None
+
+    meses = df[COLUNA_MES].cat.codes.to_numpy()
+    inicios_mes = np.flatnonzero(np.r_[True, meses[1:] != meses[:-1]])
+    alvos = np.linspace(0, len(df), n_processos * PARTICOES_POR_PROCESSO + 1)[1:-1]
+    proximos = np.clip(np.searchsorted(inicios_mes, alvos), 0, len(inicios_mes) - 1)
+    cortes = np.unique(np.r_[0, inicios_mes[proximos], len(df)])
+    return list(zip(cortes[:-1].tolist(), cortes[1:].tolist()))
+
+
+def _obter_executor():
+    # Pool compartilhado pelo processo do servidor (criado no primeiro uso). 'spawn' porque o
+    # servidor do Streamlit tem várias threads, e fork com threads ativas não é seguro.
+    global _executor
+    with _lock_executor:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=processos(), mp_context=multiprocessing.get_context('spawn')
+            )
+        return _executor
+
+
+def encerrar():
+    # Encerra o pool. Necessário em processos filhos de multiprocessing, que saem sem passar
+    # pelo encerramento automático dos pools (ficariam esperando os processos do pool)
+    global _executor
+    with _lock_executor:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
+
+
+def _arquivo(diretorio, nome):
+    return os.path.join(diretorio, nome + '.npy')
+
+
+def ler_coluna(diretorio, nome, inicio=None, fim=None):
+    # Usado pelos processos: a coluna é aberta como mapa de memória e só a fatia é lida do disco
+    # (páginas compartilhadas pelo cache do sistema entre todos os processos)
+    return np.load(_arquivo(diretorio, nome), mmap_mode='r')[inicio:fim]
+
+
+def escrever_coluna(diretorio, nome, inicio, valores):
+    # Preenche a fatia de um arquivo de saída criado por Particoes
+    saida = np.load(_arquivo(diretorio, nome), mmap_mode='r+')
+    saida[inicio:inicio + len(valores)] = valores
+    saida.flush()
+
+
+def _executar(tarefa):
+    funcao, diretorio, inicio, fim, argumentos = tarefa
+    return funcao(diretorio, inicio, fim, *argumentos)
+
+
+class Particoes:
+    # Colunas gravadas como arquivos .npy em um diretório temporário e abertas como mapa de
+    # memória pelos processos, que recebem só o nome do diretório e o intervalo de linhas.
+    # 'saidas' cria arquivos (nome: (tamanho, tipo)) que os processos preenchem na sua fatia.
+
+    def __init__(self, colunas, fronteiras, saidas=None):
+        self._temporario = tempfile.TemporaryDirectory(prefix='painel_particoes_')
+        self.diretorio = self._temporario.name
+        self.fronteiras = fronteiras
+        for nome, valores in colunas.items():
+            np.save(_arquivo(self.diretorio, nome), np.ascontiguousarray(valores))
+        for nome, (tamanho, tipo) in (saidas or {}).items():
+            np.lib.format.open_memmap(_arquivo(self.diretorio, nome), mode='w+', dtype=tipo, shape=(tamanho,))
+
+    def mapear(self, funcao, *argumentos):
+        # Resultados parciais de funcao(diretorio, inicio, fim, *argumentos), na ordem das partições
+        tarefas = [(funcao, self.diretorio, inicio, fim, argumentos) for inicio, fim in self.fronteiras]
+        return list(_obter_executor().map(_executar, tarefas))
+
+    def ler(self, nome):
+        return np.load(_arquivo(self.diretorio, nome))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self._temporario.cleanup()
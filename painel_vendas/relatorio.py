@@ -0,0 +1,373 @@
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from painel_vendas.filtros import STATUS_PADRAO, criar_filtros
+from painel_vendas.indice_bitmap import obter_indice_bitmap
+from painel_vendas.indice_tempo import obter_indice_tempo
+from painel_vendas.streamlit_falso import StreamlitFalso
+
+# Linhas da tabela de dados no relatório (a primeira página do dashboard)
+LINHAS_TABELA = 25
+
+VEGA_EMBED = (
+    '<script src="https://cdn.jsdelivr.net/npm/vega@5"></script>'
+    '<script src="https://cdn.jsdelivr.net/npm/vega-lite@5"></script>'
+    '<script src="https://cdn.jsdelivr.net/npm/vega-embed@6"></script>'
+)
+
+# Estado de cada processo do relatório (preenchido por _iniciar_processo)
+_painel = None
+_pagina = None
+_dataset = None
+
+
+class Pagina(StreamlitFalso):
+    # Ocupa o lugar do módulo streamlit no relatório: o que as funções de exibição do dashboard
+    # escreveriam na tela vira uma lista de elementos (tipo, valor), gravada depois em HTML/PNG.
+    # Configuração da página, CSS e widgets ficam com o comportamento do StreamlitFalso.
+
+    def __init__(self):
+        super().__init__()
+        self.elementos = []
+
+    @property
+    def sidebar(self):
+        return Pagina()
+
+    def limpar(self):
+        self.session_state.clear()
+        self.elementos = []
+
+    def _registrar(self, tipo, valor):
+        self.elementos.append((tipo, valor))
+
+    def title(self, texto, **kwargs):
+        self._registrar('h1', texto)
+
+    def header(self, texto, **kwargs):
+        self._registrar('h2', texto)
+
+    def subheader(self, texto, **kwargs):
+        self._registrar('h3', texto)
+
+    def write(self, texto, **kwargs):
+        self._registrar('markdown', str(texto))
+
+    def caption(self, texto, **kwargs):
+        self._registrar('caption', texto)
+
+    def info(self, texto, **kwargs):
+        self._registrar('aviso', texto)
+
+    warning = info
+
+    def metric(self, rotulo, valor, **kwargs):
+        self._registrar('metrica', (rotulo, valor))
+
+    def image(self, imagem, **kwargs):
+        self._registrar('png', imagem)
+
+    def vega_lite_chart(self, dados, especificacao, **kwargs):
+        self._registrar('vega', {**especificacao, 'data': {'values': json.loads(dados.to_json(orient='records'))}})
+
+    def dataframe(self, dados, **kwargs):
+        self._registrar('tabela', dados)
+
+    def columns(self, especificacao, **kwargs):
+        colunas = [Pagina() for _ in range(especificacao if isinstance(especificacao, int) else len(especificacao))]
+        self._registrar('colunas', colunas)
+        return colunas
+
+
+def _markdown(texto):
+    # Só o que o dashboard usa em st.write: títulos '#' e parágrafos
+    nivel = len(texto) - len(texto.lstrip('#'))
+    if nivel:
+        return f'<h{nivel}>{html.escape(texto[nivel:].strip())}</h{nivel}>'
+    return f'<p>{html.escape(texto)}</p>'
+
+
+class Gravador:
+    # Converte os elementos de uma página em HTML; as imagens viram arquivos PNG na mesma pasta
+
+    def __init__(self, pasta):
+        self.pasta = pasta
+        self.imagens = 0
+        self.graficos = 0
+
+    def html(self, elementos):
+        return '\n'.join(self._elemento(tipo, valor) for tipo, valor in elementos)
+
+    def _elemento(self, tipo, valor):
+        if tipo in ('h1', 'h2', 'h3'):
+            return f'<{tipo}>{html.escape(valor)}</{tipo}>'
+        if tipo == 'markdown':
+            return _markdown(valor)
+        if tipo == 'caption':
+            return f'<p class="legenda">{html.escape(valor)}</p>'
+        if tipo == 'aviso':
+            return f'<p class="aviso">{html.escape(valor)}</p>'
+        if tipo == 'metrica':
+            rotulo, numero = valor
+            return f'<div class="metrica"><span>{html.escape(rotulo)}</span><strong>{html.escape(numero)}</strong></div>'
+        if tipo == 'png':
+            self.imagens += 1
+            nome = f'grafico_{self.imagens:02d}.png'
+            with open(os.path.join(self.pasta, nome), 'wb') as arquivo:
+                arquivo.write(valor)
+            return f'<img src="{nome}">'
+        if tipo == 'vega':
+            self.graficos += 1
+            return (
+                f'<div id="vega{self.graficos}"></div>'
+                f'<script>vegaEmbed("#vega{self.graficos}", {json.dumps(valor, ensure_ascii=False)});</script>'
+            )
+        if tipo == 'tabela':
+            return valor.head(LINHAS_TABELA).to_html(index=False, border=0, classes='tabela')
+        if tipo == 'colunas':
+            return '<div class="colunas">' + ''.join(
+                f'<div>{self.html(coluna.elementos)}</div>' for coluna in valor
+            ) + '</div>'
+        raise ValueError(f"Elemento desconhecido: {tipo}")
+
+
+ESTILO = """
+body { font-family: sans-serif; margin: 2em; }
+.colunas { display: flex; gap: 1em; }
+.colunas > div { flex: 1; min-width: 0; }
+img { max-width: 100%; }
+.metrica span { display: block; color: #666; font-size: 0.9em; }
+.metrica strong { font-size: 1.6em; }
+.legenda { color: #666; font-size: 0.9em; }
+.aviso { background: #e8f0fe; padding: 0.5em; }
+.tabela { border-collapse: collapse; font-size: 0.8em; }
+.tabela td, .tabela th { padding: 2px 6px; border-bottom: 1px solid #ddd; }
+"""
+
+
+def documento(titulo, corpo, vega=False):
+    return (
+        '<!DOCTYPE html>\n<html lang="pt-br"><head><meta charset="utf-8">'
+        f'<title>{html.escape(titulo)}</title><style>{ESTILO}</style>{VEGA_EMBED if vega else ""}</head>'
+        f'<body>\n{corpo}\n</body></html>\n'
+    )
+
+
+def _iniciar_processo(origem, diretorio_cache, graficos):
+    # Cada processo carrega o dataset (arquivo colunar mapeado em memória, páginas compartilhadas
+    # pelo sistema) e monta as estruturas uma vez; as combinações seguintes reaproveitam tudo
+    global _painel, _pagina, _dataset
+    os.environ['PAINEL_GRAFICOS'] = graficos
+    # O relatório já divide o trabalho entre processos: sem um pool aninhado para o cubo
+    os.environ['PAINEL_PROCESSOS'] = '1'
+    _pagina = Pagina()
+    sys.modules['streamlit'] = _pagina
+
+    from painel_vendas import app, exibicao
+    from painel_vendas.carregamento import carregar_dataset
+
+    # Também quando o módulo já tinha sido importado (relatório em um processo só)
+    exibicao.BACKEND = graficos
+    _painel = app
+    _painel.definicao_parametros_graficos()
+    _dataset = carregar_dataset(origem, diretorio_cache)
+
+
+def renderizar(combinacao, abas, saida, graficos):
+    # Uma combinação de filtros: uma consulta (as métricas e os demais agregados são calculados
+    # uma vez e lidos por todos os gráficos das abas) e uma página HTML por aba
+    from painel_vendas.consultas import criar_consulta
+
+    inicio = time.perf_counter()
+    pasta = os.path.join(saida, combinacao['pasta'])
+    os.makedirs(pasta, exist_ok=True)
+    consulta = criar_consulta(_dataset, combinacao['filtros'])
+    gravador = Gravador(pasta)
+    corpo = [f'<p class="legenda">{html.escape(combinacao["descricao"])}</p>']
+    for aba in abas:
+        _pagina.limpar()
+        _painel.ABAS[aba](consulta)
+        corpo.append(f'<section><h1 class="aba">{html.escape(aba)}</h1>\n{gravador.html(_pagina.elementos)}</section>')
+    with open(os.path.join(pasta, 'index.html'), 'w', encoding='utf-8') as arquivo:
+        arquivo.write(documento(combinacao['descricao'], '\n'.join(corpo), vega=graficos == 'vega'))
+    return {'pasta': combinacao['pasta'], 'descricao': combinacao['descricao'], 'segundos': time.perf_counter() - inicio}
+
+
+def _opcoes(texto, valores, nome):
+    # 'todos' = sem filtro (None), 'cada' = um item por valor existente, ou uma lista separada por vírgulas
+    opcoes = []
+    for item in texto.split(','):
+        item = item.strip()
+        if item in ('todos', 'todas'):
+            opcoes.append(None)
+        elif item == 'cada':
+            opcoes.extend(valores)
+        elif item in valores:
+            opcoes.append(item)
+        else:
+            raise ValueError(f"Valor desconhecido em --{nome}: {item}")
+    return opcoes
+
+
+def _mes(texto):
+    return pd.Period(texto, freq='M')
+
+
+def _periodos(texto, data_min, data_max):
+    # 'tudo' = período todo, 'meses' = cada mês, 'AAAA-MM' = um mês, 'AAAA-MM:AAAA-MM' = intervalo de meses.
+    # As datas são limitadas ao intervalo do dataset, como no slider do dashboard
+    periodos = []
+    for item in texto.split(','):
+        item = item.strip()
+        if item == 'tudo':
+            periodos.append((data_min, data_max))
+            continue
+        if item == 'meses':
+            meses = pd.period_range(_mes(data_min), _mes(data_max), freq='M')
+            periodos.extend((mes.start_time.date(), mes.end_time.date()) for mes in meses)
+            continue
+        inicio, _, fim = item.partition(':')
+        periodos.append((_mes(inicio).start_time.date(), _mes(fim or inicio).end_time.date()))
+    return [(max(inicio, data_min), min(fim, data_max)) for inicio, fim in periodos if inicio <= data_max and fim >= data_min]
+
+
+def _pasta(*partes):
+    return re.sub(r'[^\w.-]+', '_', '__'.join(str(parte) for parte in partes))
+
+
+def combinacoes(dataset, estados='todos', categorias='todas', periodos='tudo', status=None):
+    # Matriz de filtros estados x categorias x períodos, com o nome da pasta e a descrição de cada uma.
+    # status=None não filtra por status (o padrão do dashboard, STATUS_PADRAO, vem do --status)
+    indice = obter_indice_bitmap(dataset)
+    indice_tempo = obter_indice_tempo(dataset)
+    lista_estados = _opcoes(estados, indice.valores('seller_state'), 'estados')
+    lista_categorias = _opcoes(categorias, indice.valores('product_category_name'), 'categorias')
+    lista_periodos = _periodos(periodos, indice_tempo.data_min(), indice_tempo.data_max())
+
+    resultado = []
+    for estado in lista_estados:
+        for categoria in lista_categorias:
+            for inicio, fim in lista_periodos:
+                resultado.append({
+                    'filtros': criar_filtros(
+                        inicio, fim,
+                        estados=None if estado is None else [estado],
+                        categorias=None if categoria is None else [categoria],
+                        status=status,
+                    ),
+                    'pasta': _pasta(estado or 'todos', categoria or 'todas', f'{inicio}_{fim}'),
+                    'descricao': (
+                        f"{estado or 'Todos os estados'} · {categoria or 'Todas as categorias'} · "
+                        f"{inicio:%d/%m/%Y} a {fim:%d/%m/%Y}"
+                    ),
+                })
+    return resultado
+
+
+def gerar(
+    saida, estados='todos', categorias='todas', periodos='tudo', status=None, abas=None,
+    graficos='matplotlib', processos=None, origem=None, diretorio_cache=None, progresso=None,
+):
+    # Renderiza todas as combinações em 'saida' (uma pasta por combinação e um índice geral).
+    # Com mais de um processo, as combinações são divididas entre eles (contexto 'spawn', que
+    # também funciona no Windows); com um, tudo roda neste processo.
+    # Este processo também prepara o app (com a Pagina no lugar do streamlit): renderiza quando
+    # roda sozinho, e as abas válidas são as do próprio dashboard (app.ABAS)
+    iniciar = (origem, diretorio_cache, graficos)
+    _iniciar_processo(*iniciar)
+    abas = abas or list(_painel.ABAS)
+    desconhecidas = [aba for aba in abas if aba not in _painel.ABAS]
+    if desconhecidas:
+        raise ValueError(f"Abas desconhecidas: {desconhecidas} (use {list(_painel.ABAS)})")
+    processos = processos or os.cpu_count() or 1
+    lista = combinacoes(_dataset, estados, categorias, periodos, status)
+    os.makedirs(saida, exist_ok=True)
+
+    feitos, erros = [], []
+    if processos == 1 or len(lista) == 1:
+        for combinacao in lista:
+            _coletar(lambda: renderizar(combinacao, abas, saida, graficos), combinacao, feitos, erros)
+            if progresso:
+                progresso(len(feitos) + len(erros), len(lista))
+    else:
+        contexto = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(
+            max_workers=min(processos, len(lista)), mp_context=contexto, initializer=_iniciar_processo, initargs=iniciar
+        ) as executor:
+            futuros = {executor.submit(renderizar, combinacao, abas, saida, graficos): combinacao for combinacao in lista}
+            for futuro in as_completed(futuros):
+                _coletar(futuro.result, futuros[futuro], feitos, erros)
+                if progresso:
+                    progresso(len(feitos) + len(erros), len(lista))
+
+    feitos.sort(key=lambda item: item['pasta'])
+    itens = ''.join(
+        f'<li><a href="{html.escape(item["pasta"])}/index.html">{html.escape(item["descricao"])}</a></li>'
+        for item in feitos
+    )
+    with open(os.path.join(saida, 'index.html'), 'w', encoding='utf-8') as arquivo:
+        arquivo.write(documento('Relatório de vendas', f'<h1>Relatório de vendas</h1><ul>{itens}</ul>'))
+    return feitos, erros
+
+
+def _coletar(obter, combinacao, feitos, erros):
+    # Um erro em uma combinação não interrompe as outras; fica registrado para o resumo
+    try:
+        feitos.append(obter())
+    except Exception as erro:
+        erros.append({'pasta': combinacao['pasta'], 'erro': repr(erro)})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Gera o relatório estático (HTML + PNG) das abas do dashboard para uma matriz de filtros.'
+    )
+    parser.add_argument('saida', help='diretório de saída (uma pasta por combinação e um index.html)')
+    parser.add_argument('--estados', default='todos', help="'todos', 'cada' ou lista separada por vírgulas (ex.: SP,RJ)")
+    parser.add_argument('--categorias', default='todas', help="'todas', 'cada' ou lista separada por vírgulas")
+    parser.add_argument(
+        '--periodos', default='tudo',
+        help="'tudo', 'meses' (um por mês), AAAA-MM ou AAAA-MM:AAAA-MM, separados por vírgulas",
+    )
+    parser.add_argument('--status', default=','.join(STATUS_PADRAO), help="status do pedido ('todos' = sem filtro)")
+    parser.add_argument('--abas', help='abas incluídas, separadas por vírgulas (padrão: todas as do dashboard)')
+    parser.add_argument(
+        '--graficos', choices=['matplotlib', 'vega'], default='matplotlib',
+        help='matplotlib: imagens PNG; vega: gráficos interativos no HTML (bibliotecas carregadas da internet)',
+    )
+    parser.add_argument('--processos', type=int, default=0, help='processos em paralelo (0 = um por núcleo)')
+    parser.add_argument('--origem', help='origem do dataset (padrão: PAINEL_DADOS ou a URL do Google Drive)')
+    args = parser.parse_args()
+
+    def progresso(n, total):
+        print(f"\r{n}/{total} combinações...", end='', flush=True)
+
+    inicio = time.perf_counter()
+    try:
+        feitos, erros = gerar(
+            args.saida,
+            estados=args.estados,
+            categorias=args.categorias,
+            periodos=args.periodos,
+            status=None if args.status == 'todos' else [s for s in args.status.split(',') if s],
+            abas=[aba.strip() for aba in args.abas.split(',')] if args.abas else None,
+            graficos=args.graficos,
+            processos=args.processos or None,
+            origem=args.origem,
+            progresso=progresso,
+        )
+    except ValueError as erro:
+        parser.error(str(erro))
+    print(f"\r{len(feitos)} combinações em {time.perf_counter() - inicio:.1f}s -> {os.path.join(args.saida, 'index.html')}")
+    for erro in erros:
+        print(f"erro em {erro['pasta']}: {erro['erro']}")
+    sys.exit(1 if erros else 0)
@@ -0,0 +1,45 @@
+class StreamlitFalso:
+    # Ocupa o lugar do módulo streamlit para rodar as funções do dashboard sem navegador
+    # (benchmark, relatório): os widgets retornam o valor padrão (ou o que estiver em
+    # session_state) e as chamadas de exibição não fazem nada. Subclasses registram o que
+    # precisam sobrescrevendo os métodos de exibição.
+
+    def __init__(self):
+        self.session_state = {}
+
+    def __getattr__(self, nome):
+        return lambda *args, **kwargs: None
+
+    @property
+    def sidebar(self):
+        return self
+
+    def columns(self, especificacao, **kwargs):
+        return [self] * (especificacao if isinstance(especificacao, int) else len(especificacao))
+
+    def tabs(self, nomes, **kwargs):
+        return [self] * len(nomes)
+
+    def fragment(self, funcao=None, **kwargs):
+        return funcao if funcao is not None else (lambda f: f)
+
+    def slider(self, rotulo, min_value=None, max_value=None, value=None, **kwargs):
+        return value
+
+    def multiselect(self, rotulo, options, default=None, **kwargs):
+        return list(default or [])
+
+    def checkbox(self, rotulo, value=False, **kwargs):
+        return value
+
+    def selectbox(self, rotulo, options, index=0, key=None, **kwargs):
+        return self.session_state.get(key, list(options)[index])
+
+    def radio(self, rotulo, options, index=0, key=None, **kwargs):
+        return self.session_state.get(key, list(options)[index])
+
+    def number_input(self, rotulo, min_value=None, max_value=None, value=None, step=None, key=None, **kwargs):
+        return self.session_state.get(key, min_value if value is None else value)
+
+    def rerun(self):
+        raise RuntimeError("st.rerun chamado fora do Streamlit (estado de filtros inconsistente)")
@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+TAMANHOS_PAGINA = [25, 50, 100, 500]
+
+
+def contar_linhas(linhas):
+    # Número de linhas de uma seleção (slice ou array de posições) sem materializar nada
+    if isinstance(linhas, slice):
+        return max(0, linhas.stop - linhas.start)
+    return len(linhas)
+
+
+def contar_paginas(linhas, tamanho):
+    return max(1, math.ceil(contar_linhas(linhas) / tamanho))
+
+
+def _posicoes(linhas):
+    if isinstance(linhas, slice):
+        return np.arange(linhas.start, linhas.stop)
+    return linhas
+
+
+def ordenar_linhas(df, linhas, coluna, crescente=True):
+    # Posições da seleção ordenadas por 'coluna', lendo só essa coluna das linhas selecionadas
+    posicoes = _posicoes(linhas)
+    serie = df[coluna]
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        # As categorias são gravadas ordenadas, então ordenar pelos códigos é ordenar pelos valores;
+        # o código -1 (ausente) vira NaN para ir para o fim
+        valores = pd.Series(serie.cat.codes.to_numpy()[posicoes])
+        valores = valores.where(valores >= 0)
+    else:
+        valores = pd.Series(serie.to_numpy()[posicoes])
+    ordem = valores.sort_values(ascending=crescente, kind='stable', na_position='last').index.to_numpy()
+    return posicoes[ordem]
+
+
+def pagina(df, linhas, colunas, numero, tamanho):
+    # Apenas as linhas da página 'numero' (começando em 1) e as colunas pedidas
+    inicio = (numero - 1) * tamanho
+    if isinstance(linhas, slice):
+        trecho = slice(linhas.start + inicio, min(linhas.stop, linhas.start + inicio + tamanho))
+    else:
+        trecho = linhas[inicio:inicio + tamanho]
+    return df.iloc[trecho, df.columns.get_indexer(colunas)].reset_index(drop=True)
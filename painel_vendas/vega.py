@@ -0,0 +1,118 @@
+# Especificações Vega-Lite equivalentes aos gráficos de painel_vendas.graficos.
+# Recebem os mesmos frames agregados; o navegador desenha, o servidor só envia o JSON.
+
+ALTURA = 260
+
+
+def _base(titulo):
+    return {
+        '$schema': 'https://vega.github.io/schema/vega-lite/v5.json',
+        'title': titulo,
+        'height': ALTURA,
+    }
+
+
+def barras(dados, x, y, titulo, xlabel, ylabel):
+    return {
+        **_base(titulo),
+        'mark': 'bar',
+        'encoding': {
+            'x': {'field': x, 'type': 'nominal', 'title': xlabel, 'sort': None},
+            'y': {'field': y, 'type': 'quantitative', 'title': ylabel},
+            'tooltip': [{'field': x, 'type': 'nominal'}, {'field': y, 'type': 'quantitative', 'format': ',.2f'}],
+        },
+    }
+
+
+def linha(dados, x, y, titulo, xlabel, ylabel):
+    return {
+        **_base(titulo),
+        'mark': {'type': 'line', 'point': True},
+        'encoding': {
+            'x': {'field': x, 'type': 'ordinal', 'title': xlabel, 'axis': {'labelAngle': -60}},
+            'y': {'field': y, 'type': 'quantitative', 'title': ylabel},
+            'tooltip': [{'field': x, 'type': 'ordinal'}, {'field': y, 'type': 'quantitative', 'format': ',.2f'}],
+        },
+    }
+
+
+def barras_categoria(dados, media):
+    return {
+        **_base('Vendas por Categoria'),
+        'layer': [
+            {
+                'mark': 'bar',
+                'encoding': {
+                    'x': {
+                        'field': 'product_category_name', 'type': 'nominal', 'title': 'Categoria',
+                        'sort': '-y', 'axis': {'labelAngle': -80},
+                    },
+                    'y': {'field': 'total_price', 'type': 'quantitative', 'title': 'Total de Vendas (R$)'},
+                    'color': {'field': 'product_category_name', 'type': 'nominal', 'legend': None,
+                              'scale': {'scheme': 'viridis'}, 'sort': '-y'},
+                    'tooltip': [
+                        {'field': 'product_category_name', 'type': 'nominal'},
+                        {'field': 'total_price', 'type': 'quantitative', 'format': ',.2f'},
+                    ],
+                },
+            },
+            {
+                # Linha da média das categorias
+                'mark': {'type': 'rule', 'color': 'red', 'strokeDash': [6, 4]},
+                'encoding': {'y': {'datum': float(media)}},
+            },
+            {
+                'mark': {'type': 'text', 'color': 'red', 'align': 'right', 'dy': -6, 'x': 'width'},
+                'encoding': {
+                    'y': {'datum': float(media)},
+                    'text': {'value': f'Média de Vendas das categorias: {media:,.2f}'},
+                },
+            },
+        ],
+    }
+
+
+def comparacao_periodos(dados, titulo, xlabel='Categoria', legenda='Ano'):
+    # Barras lado a lado: as colunas de período viram linhas (fold) e o período vira a cor
+    dimensao = dados.columns[0]
+    periodos = list(dados.columns[1:])
+    return {
+        **_base(titulo),
+        'transform': [{'fold': periodos, 'as': [legenda, 'total_price']}],
+        'mark': 'bar',
+        'encoding': {
+            'x': {
+                'field': dimensao, 'type': 'nominal', 'title': xlabel,
+                'sort': list(dados[dimensao]), 'axis': {'labelAngle': -80},
+            },
+            'xOffset': {'field': legenda, 'type': 'nominal', 'sort': periodos},
+            'y': {'field': 'total_price', 'type': 'quantitative', 'title': 'Total de Vendas (R$)'},
+            'color': {'field': legenda, 'type': 'nominal', 'sort': periodos,
+                      'scale': {'range': ['skyblue', 'orange']}},
+            'tooltip': [
+                {'field': dimensao, 'type': 'nominal'},
+                {'field': legenda, 'type': 'nominal'},
+                {'field': 'total_price', 'type': 'quantitative', 'format': ',.2f'},
+            ],
+        },
+    }
+
+
+def histograma_fotos(dados):
+    # Barras por quantidade de fotos + curva suavizada (loess) no lugar da KDE do seaborn
+    eixo_x = {'field': 'product_photos_qty', 'type': 'quantitative', 'title': 'Quantidade de Fotos'}
+    eixo_y = {'field': 'quantidade_pedidos', 'type': 'quantitative', 'title': 'Quantidade de Pedidos Únicos'}
+    return {
+        **_base('Relação entre Quantidade de Fotos e Pedidos Únicos'),
+        'layer': [
+            {
+                'mark': {'type': 'bar', 'color': 'blue', 'opacity': 0.6},
+                'encoding': {'x': {**eixo_x, 'bin': {'step': 1}}, 'y': eixo_y},
+            },
+            {
+                'transform': [{'loess': 'quantidade_pedidos', 'on': 'product_photos_qty'}],
+                'mark': {'type': 'line', 'color': 'red', 'strokeWidth': 1},
+                'encoding': {'x': eixo_x, 'y': eixo_y},
+            },
+        ],
+    }